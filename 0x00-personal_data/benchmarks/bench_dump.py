@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the PII audit dump: rows/s of log_rows (one record at
+a time) and dump_rows (one write per batch), on user_data.csv rows
+written to /dev/null.
+Usage: ./bench_dump.py [rows] [batch_size]
+"""
+import csv
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from filtered_logger import (  # noqa: E402
+    PII_FIELDS, RedactingFormatter, dump_rows, log_rows)
+
+
+def user_rows():
+    """
+    The columns and rows of user_data.csv.
+    """
+    path = os.path.join(os.path.dirname(__file__), os.pardir,
+                        "user_data.csv")
+    with open(path, newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        columns = next(reader)
+        return columns, list(reader)
+
+
+def null_logger(name, stream, backend):
+    """
+    A non propagating logger redacting records to a stream.
+    """
+    logger = logging.getLogger(name)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(RedactingFormatter(PII_FIELDS, backend))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def main():
+    """
+    Dumps the same rows through both paths and both backends.
+    """
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    columns, rows = user_rows()
+    batch = (rows * (batch_size // len(rows) + 1))[:batch_size]
+    batches = max(1, total // batch_size)
+    with open(os.devnull, 'w') as stream:
+        for backend in RedactingFormatter.BACKENDS:
+            for path in (log_rows, dump_rows):
+                logger = null_logger("bench_{}_{}".format(
+                    path.__name__, backend), stream, backend)
+                start = time.perf_counter()
+                for _ in range(batches):
+                    path(logger, columns, batch)
+                elapsed = time.perf_counter() - start
+                print("{:<9} {:<9} {:>10.0f} rows/s".format(
+                    path.__name__, backend,
+                    batches * batch_size / elapsed))
+
+
+if __name__ == "__main__":
+    main()
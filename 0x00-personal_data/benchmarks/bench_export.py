@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the PII export end to end: main() reads a SQLite
+users table seeded from user_data.csv through get_pool() and
+dumps it to /dev/null, for a few PERSONAL_DATA_BATCH_SIZE values.
+Usage: ./bench_export.py [rows]
+"""
+import contextlib
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+import filtered_logger  # noqa: E402
+from db_pool import load_users_csv  # noqa: E402
+
+
+def seed(database, total):
+    """
+    Loads user_data.csv and doubles it up to `total` rows.
+    """
+    path = os.path.join(os.path.dirname(__file__), os.pardir,
+                        "user_data.csv")
+    connection = sqlite3.connect(database)
+    count = load_users_csv(connection, path)
+    while count < total:
+        connection.execute(
+            "INSERT INTO users SELECT * FROM users LIMIT ?;",
+            (total - count,))
+        count, = connection.execute(
+            "SELECT COUNT(*) FROM users;").fetchone()
+    connection.commit()
+    connection.close()
+    return count
+
+
+def main():
+    """
+    Runs main() over the seeded database once per batch size.
+    """
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp, \
+            open(os.devnull, 'w') as stream:
+        database = os.path.join(tmp, "users.db")
+        count = seed(database, total)
+        os.environ["PERSONAL_DATA_DB_BACKEND"] = "sqlite"
+        os.environ["PERSONAL_DATA_DB_NAME"] = database
+        for batch_size in (1, 100, 1000, 10000):
+            os.environ["PERSONAL_DATA_BATCH_SIZE"] = str(batch_size)
+            with contextlib.redirect_stderr(stream):
+                start = time.perf_counter()
+                filtered_logger.main()
+                elapsed = time.perf_counter() - start
+            print("batch {:>6} {:>10.0f} rows/s".format(
+                batch_size, count / elapsed))
+        filtered_logger.shutdown_logger(logging.getLogger("user_data"))
+        filtered_logger.get_pool().close()
+
+
+if __name__ == "__main__":
+    main()
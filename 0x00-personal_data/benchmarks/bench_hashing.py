@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark of HashingService: hashes/s and verifications/s against
+the bcrypt cost factor and the number of worker processes, next to
+hash_password on the calling thread.
+Usage: ./bench_hashing.py [passwords] [costs] [workers]
+e.g.   ./bench_hashing.py 64 4,8,10,12 1,2,4
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from encrypt_password import (  # noqa: E402
+    HashingService, hash_password, is_valid)
+
+
+def rate(count, func, *args):
+    """
+    Calls func(*args) and returns count divided by its duration.
+    """
+    start = time.perf_counter()
+    func(*args)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    """
+    Prints one line per cost factor and worker count.
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    costs = [int(cost) for cost in (
+        sys.argv[2] if len(sys.argv) > 2 else "4,8,10,12").split(',')]
+    workers = [int(worker) for worker in (
+        sys.argv[3] if len(sys.argv) > 3 else "1,2,{}".format(
+            os.cpu_count())).split(',')]
+    passwords = ["password-{}".format(i) for i in range(count)]
+    print("{:>4} {:>8} {:>12} {:>12}".format(
+        "cost", "workers", "hashes/s", "verifies/s"))
+    for cost in costs:
+        hashes = [hash_password(password, cost) for password in passwords]
+        print("{:>4} {:>8} {:>12.1f} {:>12.1f}".format(
+            cost, "thread", rate(count, lambda: [
+                hash_password(password, cost) for password in passwords]),
+            rate(count, lambda: [is_valid(hashed, password) for hashed,
+                                 password in zip(hashes, passwords)])))
+        for worker_count in workers:
+            with HashingService(worker_count, cost) as service:
+                service.hash_many(passwords[:worker_count])
+                hashed = rate(count, service.hash_many, passwords)
+                verified = rate(count, service.verify_many,
+                                zip(hashes, passwords))
+            print("{:>4} {:>8} {:>12.1f} {:>12.1f}".format(
+                cost, worker_count, hashed, verified))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Module for pooling database connections.
+Also provides a SQLite stand-in for the users database so the
+pool and the export can run without a MySQL server.
+"""
+import csv
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+
+_seed_lock = threading.Lock()
+
+
+def is_alive(connection: Any) -> bool:
+    """
+    Checks that a connection can still talk to its database.
+    """
+    if hasattr(connection, 'is_connected'):
+        return connection.is_connected()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1;")
+        cursor.fetchall()
+        cursor.close()
+        return True
+    except Exception:
+        return False
+
+
+class ConnectionPool:
+    """
+    Keeps up to `size` connections opened by `factory` and lends
+    them to one caller at a time. Connections are opened lazily
+    and health-checked every time they are borrowed.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 5,
+                 timeout: float = 30.0):
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(size)
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self) -> Any:
+        """
+        Opens a connection in a slot that is already reserved.
+        """
+        try:
+            return self.factory()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def acquire(self) -> Any:
+        """
+        Borrows a healthy connection from the pool.
+        Raises TimeoutError if none is free after `timeout` seconds.
+        """
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                return self._open()
+            try:
+                connection = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise TimeoutError(
+                    "No database connection free after {}s".format(
+                        self.timeout))
+        if is_alive(connection):
+            return connection
+        try:
+            connection.close()
+        except Exception:
+            pass
+        return self._open()
+
+    def release(self, connection: Any):
+        """
+        Gives a borrowed connection back to the pool.
+        """
+        self._idle.put_nowait(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Borrows a connection for the duration of a with block.
+        """
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self):
+        """
+        Closes every idle connection of the pool.
+        """
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                self._opened -= 1
+            connection.close()
+
+
+def sqlite_connect(database: str = "") -> sqlite3.Connection:
+    """
+    Opens a SQLite connection usable from any thread.
+    Without a database file, every connection of the process
+    shares one in-memory database.
+    """
+    if database == "":
+        return sqlite3.connect("file::memory:?cache=shared", uri=True,
+                               check_same_thread=False)
+    return sqlite3.connect(database, check_same_thread=False)
+
+
+def load_users_csv(connection: Any, csv_path: str,
+                   table: str = "users") -> int:
+    """
+    Creates a table from a CSV file such as user_data.csv and
+    returns the number of rows inserted.
+    """
+    with open(csv_path, newline='') as f:
+        reader = csv.reader(f)
+        columns = next(reader)
+        cursor = connection.cursor()
+        cursor.execute("CREATE TABLE IF NOT EXISTS {} ({});".format(
+            table, ", ".join("{} TEXT".format(c) for c in columns)))
+        cursor.executemany("INSERT INTO {} VALUES ({});".format(
+            table, ", ".join("?" * len(columns))), reader)
+        row_count = cursor.rowcount
+        cursor.close()
+    connection.commit()
+    return row_count
+
+
+def seed_users_csv(connection: Any, csv_path: str,
+                   table: str = "users") -> int:
+    """
+    Loads a CSV file into a SQLite table unless the table exists
+    already, and returns the number of rows inserted.
+    """
+    with _seed_lock:
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master"
+                       " WHERE type = 'table' AND name = ?;", (table,))
+        exists = cursor.fetchone() is not None
+        cursor.close()
+        if exists:
+            return 0
+        return load_users_csv(connection, csv_path, table)
@@ -1,14 +1,24 @@
 #!/usr/bin/env python3
 """This module provides functionality 4 password encryption.
 """
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterable, List, Optional, Tuple
+
 import bcrypt
 
 
-def hash_password(password: str) -> bytes:
+DEFAULT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_PREFIX = b'2b'
+
+
+def hash_password(password: str, rounds: int = DEFAULT_ROUNDS) -> bytes:
     """Generates a salted hash of the provided password.
     plain_text (str)
+    rounds (int): bcrypt work factor
     """
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds))
 
 
 def is_valid(hashed_password: bytes, password: str) -> bool:
@@ -16,3 +26,80 @@ def is_valid(hashed_password: bytes, password: str) -> bool:
     stored_hash (bytes)
     """
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+
+
+def needs_rehash(hashed_password: bytes, rounds: int = DEFAULT_ROUNDS) -> bool:
+    """Tells if a stored hash is out of policy: not a `$2b$` bcrypt
+    hash or not hashed with the `rounds` work factor.
+    """
+    parts = hashed_password.split(b'$')
+    if len(parts) != 4 or parts[0] != b'' or parts[1] != BCRYPT_PREFIX:
+        return True
+    try:
+        return int(parts[2]) != rounds
+    except ValueError:
+        return True
+
+
+def verify_and_update(
+        hashed_password: bytes, password: str, rounds: int = DEFAULT_ROUNDS,
+        ) -> Tuple[bool, Optional[bytes]]:
+    """Verifies a password and upgrades its hash when needed.
+    Returns (valid, new_hash): new_hash is a fresh hash at the
+    `rounds` work factor when the password is valid and the stored
+    hash is out of policy, None otherwise. Callers persist new_hash
+    to move stored hashes to the current policy on login.
+    """
+    try:
+        valid = is_valid(hashed_password, password)
+    except ValueError:
+        return False, None
+    if valid and needs_rehash(hashed_password, rounds):
+        return True, hash_password(password, rounds)
+    return valid, None
+
+
+class HashingService:
+    """Hashes and verifies batches of passwords on a process pool,
+    so bulk work uses every core instead of the calling thread.
+    """
+
+    def __init__(self, workers: int = None, rounds: int = DEFAULT_ROUNDS):
+        """Starts a pool of `workers` processes (one per CPU by default)
+        hashing with the `rounds` work factor.
+        """
+        self.workers = workers or os.cpu_count()
+        self.rounds = rounds
+        self._executor = ProcessPoolExecutor(self.workers)
+
+    def hash_many(self, passwords: Iterable[str]) -> List[bytes]:
+        """Hashes passwords in parallel, keeping their order.
+        """
+        return list(self._executor.map(
+            hash_password, passwords, repeat(self.rounds)))
+
+    def verify_many(
+            self, pairs: Iterable[Tuple[bytes, str]]) -> List[bool]:
+        """Checks (hashed_password, password) pairs in parallel,
+        keeping their order.
+        """
+        pairs = list(pairs)
+        if len(pairs) == 0:
+            return []
+        hashed_passwords, passwords = zip(*pairs)
+        return list(self._executor.map(is_valid, hashed_passwords, passwords))
+
+    def close(self):
+        """Waits for pending work and stops the worker processes.
+        """
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'HashingService':
+        """Uses the service in a with block.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stops the service at the end of a with block.
+        """
+        self.close()
@@ -6,8 +6,17 @@ returns the log message obfuscated
 import os
 import mysql.connector
 import re
+import time
+import atexit
+import queue
+import threading
 import logging
-from typing import List
+from logging.handlers import QueueHandler, QueueListener
+from contextlib import closing
+from functools import lru_cache, partial
+from typing import IO, Callable, FrozenSet, List, Tuple
+
+from db_pool import ConnectionPool, seed_users_csv, sqlite_connect
 
 
 pattern = {
@@ -15,6 +24,11 @@ pattern = {
     'replace': lambda x: r'\g<field>={}'.format(x),
 }
 PII_FIELDS = ("name", "email", "phone", "ssn", "password")
+OVERFLOW_POLICIES = ("block", "drop_oldest", "count")
+_loggers = {}
+_loggers_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
 
 
 def filter_datum(
@@ -23,64 +37,351 @@ def filter_datum(
     """
     Redacts specified fields in a log message.
     """
+    return compile_redactor(tuple(fields), redaction, separator)(message)
+
+
+@lru_cache(maxsize=64)
+def compile_redactor(
+        fields: Tuple[str, ...], redaction: str, separator: str,
+        ) -> Callable[[str], str]:
+    """
+    Compiles the redaction regex for a set of fields once and
+    returns a function that redacts a message with it.
+    """
     extract, replace = (pattern["extract"], pattern["replace"])
-    return re.sub(extract(fields, separator), replace(redaction), message)
+    regex = re.compile(extract(fields, separator))
+    template = replace(redaction)
+    return lambda message: regex.sub(template, message)
+
+
+def tokenize_datum(
+        fields: FrozenSet[str], redaction: str, message: str, separator: str,
+        ) -> str:
+    """
+    Redacts specified fields in a log message without a regex.
+    The message is split once on the separator and every `key=`
+    token whose key is one of the fields gets its value replaced.
+    """
+    tokens = message.split(separator)
+    for idx, token in enumerate(tokens):
+        key, equal, _ = token.partition('=')
+        if equal and key.rsplit(' ', 1)[-1] in fields:
+            tokens[idx] = '{}={}'.format(key, redaction)
+    return separator.join(tokens)
 
 
-def get_logger() -> logging.Logger:
+def get_logger(
+        name: str = "user_data", fields: Tuple[str, ...] = PII_FIELDS,
+        stream: IO = None, async_mode: bool = False,
+        queue_size: int = 10000, overflow: str = "count",
+        ) -> logging.Logger:
     """
     Sets up and returns a configured logger for user data.
+    Loggers are cached by name, fields and stream: calling again
+    with the same settings returns the logger as is, and new
+    settings replace the handler installed for that name.
+    With async_mode, records go through a bounded queue and a
+    listener thread does the redaction and the stream I/O;
+    overflow picks what happens when the queue is full.
     """
-    logger = logging.getLogger("user_data")
-    stream_h = logging.StreamHandler()
-    stream_h.setFormatter(RedactingFormatter(PII_FIELDS))
-    logger.setLevel(logging.INFO)
-    logger.propagate = False
-    logger.addHandler(stream_h)
-    return logger
+    key = (tuple(fields), stream, async_mode, queue_size, overflow)
+    with _loggers_lock:
+        logger = logging.getLogger(name)
+        cached_key, handler = _loggers.get(name, (None, None))
+        if cached_key == key and handler in logger.handlers and \
+                _is_running(handler):
+            return logger
+        if handler is not None:
+            logger.removeHandler(handler)
+            _stop_handler(handler)
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(RedactingFormatter(fields))
+        if async_mode:
+            log_queue = queue.Queue(queue_size)
+            listener = FlushingQueueListener(log_queue, handler)
+            listener.start()
+            handler = BoundedQueueHandler(log_queue, overflow)
+            handler.listener = listener
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        _loggers[name] = (key, handler)
+        return logger
+
+
+def _is_running(handler: logging.Handler) -> bool:
+    """
+    Tells if a handler can still write: a queue handler whose
+    listener thread was stopped would only fill its queue.
+    """
+    listener = getattr(handler, 'listener', None)
+    return listener is None or listener._thread is not None
+
+
+def _stop_handler(handler: logging.Handler):
+    """
+    Stops the listener thread of a queue handler, if any, and
+    flushes the handler.
+    """
+    listener = getattr(handler, 'listener', None)
+    if listener is not None:
+        listener.stop()
+    handler.flush()
+
+
+def _stop_loggers():
+    """
+    Stops the handlers of every cached logger, flushing the async
+    ones: registered once with atexit.
+    """
+    with _loggers_lock:
+        handlers = [handler for _, handler in _loggers.values()]
+    for handler in handlers:
+        _stop_handler(handler)
+
+
+atexit.register(_stop_loggers)
+
+
+def shutdown_logger(logger: logging.Logger):
+    """
+    Stops the listener threads of an async logger once every
+    queued record has been written. The handler get_logger
+    installed is removed, so the next get_logger call for that
+    name builds a new one.
+    """
+    with _loggers_lock:
+        _, cached = _loggers.pop(logger.name, (None, None))
+        handlers = list(logger.handlers)
+        if cached in handlers:
+            logger.removeHandler(cached)
+    for handler in handlers:
+        _stop_handler(handler)
+
+
+@lru_cache(maxsize=None)
+def db_settings() -> dict:
+    """
+    Reads the PERSONAL_DATA_DB_* environment variables once.
+    """
+    return {
+        'backend': os.getenv("PERSONAL_DATA_DB_BACKEND", "mysql"),
+        'host': os.getenv("PERSONAL_DATA_DB_HOST", "localhost"),
+        'database': os.getenv("PERSONAL_DATA_DB_NAME", ""),
+        'csv': os.getenv("PERSONAL_DATA_DB_CSV", os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "user_data.csv")),
+        'user': os.getenv("PERSONAL_DATA_DB_USERNAME", "root"),
+        'password': os.getenv("PERSONAL_DATA_DB_PASSWORD", ""),
+        'connect_timeout': int(
+            os.getenv("PERSONAL_DATA_DB_CONNECT_TIMEOUT", "10")),
+        'pool_size': int(os.getenv("PERSONAL_DATA_DB_POOL_SIZE", "5")),
+        'pool_timeout': float(
+            os.getenv("PERSONAL_DATA_DB_POOL_TIMEOUT", "30")),
+    }
 
 
 def get_db() -> mysql.connector.connection.MySQLConnection:
     """
     Establishes and returns a connection to the MySQL database
     and uses environment variables for connection details.
+    With PERSONAL_DATA_DB_BACKEND=sqlite, PERSONAL_DATA_DB_NAME is
+    opened as a SQLite database instead, and a missing users table
+    is seeded from PERSONAL_DATA_DB_CSV (user_data.csv by default).
     """
-    database_host = os.getenv("PERSONAL_DATA_DB_HOST", "localhost")
-    database_name = os.getenv("PERSONAL_DATA_DB_NAME", "")
-    database_user = os.getenv("PERSONAL_DATA_DB_USERNAME", "root")
-    database_pwd = os.getenv("PERSONAL_DATA_DB_PASSWORD", "")
+    settings = db_settings()
+    if settings['backend'] == 'sqlite':
+        connection = sqlite_connect(settings['database'])
+        if settings['csv'] != "":
+            try:
+                seed_users_csv(connection, settings['csv'])
+            except Exception:
+                connection.close()
+                raise
+        return connection
     connection = mysql.connector.connect(
-        host=database_host,
+        host=settings['host'],
         port=3306,
-        user=database_user,
-        password=database_pwd,
-        database=database_name,
+        user=settings['user'],
+        password=settings['password'],
+        database=settings['database'],
+        connection_timeout=settings['connect_timeout'],
     )
     return connection
 
 
+def get_pool() -> ConnectionPool:
+    """
+    Returns the process wide pool of get_db connections.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            settings = db_settings()
+            _pool = ConnectionPool(
+                get_db, settings['pool_size'], settings['pool_timeout'])
+            atexit.register(_pool.close)
+        return _pool
+
+
+def format_row(columns: List[str], row: Tuple) -> str:
+    """
+    Builds the `column=value;` log message of a users row.
+    """
+    record = map(lambda x: '{}={}'.format(x[0], x[1]), zip(columns, row))
+    return '{};'.format('; '.join(record))
+
+
+def log_rows(logger: logging.Logger, columns: List[str], rows: List[Tuple]):
+    """
+    Logs users rows one record at a time through the logger.
+    """
+    for row in rows:
+        args = (logger.name, logging.INFO, "(unknown file)", 0,
+                format_row(columns, row), None, None)
+        logger.handle(logging.LogRecord(*args))
+
+
+def dump_rows(logger: logging.Logger, columns: List[str], rows: List[Tuple]):
+    """
+    Logs users rows as one chunk: every stream handler with a
+    RedactingFormatter gets the whole chunk redacted in one pass
+    and written with a single write and flush.
+    Output is the same as log_rows, which is used instead unless
+    the logger does not propagate and every handler of the logger
+    is a stream handler with an open stream.
+    """
+    if logger.disabled or len(logger.filters) > 0 or logger.propagate \
+            or len(logger.handlers) == 0 \
+            or not all(map(_has_open_stream, logger.handlers)):
+        return log_rows(logger, columns, rows)
+    records = [
+        logging.LogRecord(logger.name, logging.INFO, "(unknown file)", 0,
+                          format_row(columns, row), None, None)
+        for row in rows
+    ]
+    if len(records) == 0:
+        return
+    for handler in logger.handlers:
+        if logging.INFO < handler.level:
+            continue
+        formatter = handler.formatter
+        if not isinstance(formatter, RedactingFormatter) or \
+                len(handler.filters) > 0:
+            for record in records:
+                handler.handle(record)
+            continue
+        handler.acquire()
+        try:
+            chunk = formatter.format_many(records, handler.terminator)
+            handler.stream.write(chunk)
+            handler.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            handler.handleError(records[0])
+        finally:
+            handler.release()
+
+
+def _has_open_stream(handler: logging.Handler) -> bool:
+    """
+    Tells if a handler is a stream handler whose stream is open:
+    a FileHandler with delay=True has none until its first record.
+    """
+    if not isinstance(handler, logging.StreamHandler):
+        return False
+    stream = handler.stream
+    return stream is not None and not getattr(stream, 'closed', False)
+
+
 def main():
-    """Logs user data from the database, redacting sensitive information."""
+    """Logs user data from the database, redacting sensitive information.
+    Rows are streamed in `PERSONAL_DATA_BATCH_SIZE` batches through an
+    unbuffered cursor so the table is never held in memory at once.
+    """
     fields = "name,email,phone,ssn,password,ip,last_login,user_agent"
     columns = fields.split(',')
     query = "SELECT {} FROM users;".format(fields)
+    batch_size = int(os.getenv("PERSONAL_DATA_BATCH_SIZE", "1000"))
     info_logger = get_logger()
-    connection = get_db()
-    with connection.cursor() as cursor:
+    row_count = 0
+    start = time.perf_counter()
+    with get_pool().connection() as connection, \
+            closing(connection.cursor()) as cursor:
         cursor.execute(query)
-        rows = cursor.fetchall()
-        row_idx = 0
-        while row_idx < len(rows):
-            row = rows[row_idx]
-            record = map(
-                lambda x: '{}={}'.format(x[0], x[1]),
-                zip(columns, row),
-            )
-            msg = '{};'.format('; '.join(list(record)))
-            args = ("user_data", logging.INFO, None, None, msg, None, None)
-            log_record = logging.LogRecord(*args)
-            info_logger.handle(log_record)
-            row_idx += 1
+        rows = cursor.fetchmany(batch_size)
+        while len(rows) > 0:
+            dump_rows(info_logger, columns, rows)
+            row_count += len(rows)
+            rows = cursor.fetchmany(batch_size)
+    elapsed = time.perf_counter() - start
+    info_logger.info("exported {} rows in {:.3f}s ({:.0f} rows/s)".format(
+        row_count, elapsed, row_count / elapsed if elapsed > 0 else 0))
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded queue that applies a backpressure
+    policy when the queue is full:
+    block waits for room, drop_oldest discards the oldest queued
+    record and count discards the new one. Discarded records are
+    counted in `dropped`.
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = "count"):
+        super(BoundedQueueHandler, self).__init__(log_queue)
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("Unknown overflow policy: {}".format(overflow))
+        self.overflow = overflow
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def _drop(self):
+        """
+        Counts a discarded record.
+        """
+        with self._dropped_lock:
+            self.dropped += 1
+
+    def enqueue(self, record: logging.LogRecord):
+        """
+        Puts a record on the queue according to the overflow policy.
+        """
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            self._drop()
+        if self.overflow == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                self._drop()
+
+
+class FlushingQueueListener(QueueListener):
+    """
+    QueueListener that waits for room for its stop sentinel, so
+    stopping always drains the queue, and that can be stopped twice.
+    """
+
+    def enqueue_sentinel(self):
+        """
+        Blocks until the stop sentinel is queued.
+        """
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        """
+        Writes every queued record and stops the listener thread.
+        """
+        if self._thread is not None:
+            super(FlushingQueueListener, self).stop()
 
 
 class RedactingFormatter(logging.Formatter):
@@ -94,18 +395,51 @@ class RedactingFormatter(logging.Formatter):
     FORMAT = "[HOLBERTON] %(name)s %(levelname)s %(asctime)-15s: %(message)s"
     FORMAT_FIELDS = ('name', 'levelname', 'asctime', 'message')
     SEPARATOR = ";"
+    BACKENDS = ('regex', 'tokenize')
 
-    def __init__(self, fields: List[str]):
+    def __init__(self, fields: List[str], backend: str = 'regex'):
         super(RedactingFormatter, self).__init__(self.FORMAT)
+        if backend not in self.BACKENDS:
+            raise ValueError("Unknown redaction backend: {}".format(backend))
         self.fields = fields
+        self.backend = backend
+        if backend == 'tokenize':
+            self._redact = partial(
+                tokenize_datum, frozenset(fields), self.REDACTION,
+                separator=self.SEPARATOR)
+        else:
+            self._redact = compile_redactor(
+                tuple(fields), self.REDACTION, self.SEPARATOR)
 
     def format(self, record: logging.LogRecord) -> str:
         """
         Formats the log record, applying redaction to specified fields.
         """
         msg = super(RedactingFormatter, self).format(record)
-        txt = filter_datum(self.fields, self.REDACTION, msg, self.SEPARATOR)
-        return txt
+        return self._redact(msg)
+
+    def format_many(
+            self, records: List[logging.LogRecord], terminator: str = '\n',
+            ) -> str:
+        """
+        Formats several log records into one terminated chunk,
+        redacting the whole chunk in one pass. Records whose line
+        does not end with the separator are redacted on their own
+        so a value never runs into the next line.
+        """
+        chunks, lines = [], []
+        for record in records:
+            line = super(RedactingFormatter, self).format(record)
+            if line.endswith(self.SEPARATOR):
+                lines.append(line)
+                continue
+            if len(lines) > 0:
+                chunks.append(self._redact(terminator.join(lines)))
+                lines = []
+            chunks.append(self._redact(line))
+        if len(lines) > 0:
+            chunks.append(self._redact(terminator.join(lines)))
+        return terminator.join(chunks) + terminator
 
 
 while __name__ == "__main__":
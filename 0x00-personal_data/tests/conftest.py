@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+""" Puts the project modules on the import path of the tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+""" Tests of the connection pool and the SQLite stand-in
+"""
+import io
+import os
+import sqlite3
+import threading
+
+import pytest
+
+import filtered_logger
+from db_pool import ConnectionPool, load_users_csv, seed_users_csv
+
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), os.pardir,
+                        "user_data.csv")
+
+
+class FakeConnection:
+    """ A connection whose health can be switched off
+    """
+
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def is_connected(self):
+        return self.alive
+
+    def close(self):
+        self.closed = True
+
+
+def counting_factory():
+    """ A factory of FakeConnection recording what it opened
+    """
+    opened = []
+
+    def factory():
+        opened.append(FakeConnection())
+        return opened[-1]
+    return factory, opened
+
+
+def test_pool_opens_lazily():
+    """ Connections are opened on demand and reused once released
+    """
+    factory, opened = counting_factory()
+    pool = ConnectionPool(factory, size=3)
+    assert opened == []
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert len(opened) == 1
+    with pool.connection() as a, pool.connection() as b:
+        assert a is not b
+    assert len(opened) == 2
+
+
+def test_pool_replaces_dead_connections():
+    """ A connection failing its health check is closed and replaced
+    """
+    factory, opened = counting_factory()
+    pool = ConnectionPool(factory, size=1)
+    with pool.connection() as connection:
+        connection.alive = False
+    with pool.connection() as replacement:
+        assert replacement is not connection
+    assert connection.closed
+    assert len(opened) == 2
+
+
+def test_pool_times_out_when_exhausted():
+    """ acquire raises TimeoutError once every connection is lent
+    """
+    factory, opened = counting_factory()
+    pool = ConnectionPool(factory, size=1, timeout=0.05)
+    connection = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    pool.release(connection)
+    assert pool.acquire() is connection
+
+
+def test_pool_waits_for_a_release():
+    """ A waiting acquire gets the connection released by another
+    """
+    factory, opened = counting_factory()
+    pool = ConnectionPool(factory, size=1, timeout=5)
+    connection = pool.acquire()
+    timer = threading.Timer(0.05, pool.release, (connection,))
+    timer.start()
+    assert pool.acquire() is connection
+    timer.join()
+    assert len(opened) == 1
+
+
+def test_pool_frees_slot_when_open_fails():
+    """ A failing factory does not use up a slot of the pool
+    """
+    failures = [ConnectionError("down")] * 2
+    factory, opened = counting_factory()
+
+    def flaky():
+        if failures:
+            raise failures.pop()
+        return factory()
+    pool = ConnectionPool(flaky, size=1, timeout=0.05)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            pool.acquire()
+    assert pool.acquire() is opened[0]
+
+
+def test_pool_close_closes_idle_connections():
+    """ close closes the idle connections and frees their slots
+    """
+    factory, opened = counting_factory()
+    pool = ConnectionPool(factory, size=1)
+    with pool.connection():
+        pass
+    pool.close()
+    assert opened[0].closed
+    with pool.connection() as connection:
+        assert connection is opened[1]
+
+
+def test_seed_users_csv_loads_once(tmp_path):
+    """ seed_users_csv only loads a table that does not exist
+    """
+    connection = sqlite3.connect(str(tmp_path / "users.db"))
+    assert seed_users_csv(connection, CSV_PATH) == 12
+    assert seed_users_csv(connection, CSV_PATH) == 0
+    count, = connection.execute("SELECT COUNT(*) FROM users;").fetchone()
+    assert count == 12
+    connection.close()
+
+
+@pytest.fixture
+def sqlite_settings(monkeypatch, tmp_path):
+    """ Points get_db at a SQLite file and resets the global pool
+    """
+    monkeypatch.setenv("PERSONAL_DATA_DB_BACKEND", "sqlite")
+    monkeypatch.setenv("PERSONAL_DATA_DB_NAME", str(tmp_path / "users.db"))
+    monkeypatch.setenv("PERSONAL_DATA_BATCH_SIZE", "5")
+    filtered_logger.db_settings.cache_clear()
+    monkeypatch.setattr(filtered_logger, "_pool", None)
+    yield tmp_path / "users.db"
+    if filtered_logger._pool is not None:
+        filtered_logger._pool.close()
+    filtered_logger.db_settings.cache_clear()
+
+
+def test_main_exports_seeded_sqlite(sqlite_settings, monkeypatch):
+    """ main exports the users seeded from user_data.csv, redacted
+    """
+    stream = io.StringIO()
+    monkeypatch.setattr("sys.stderr", stream)
+    logger = filtered_logger.get_logger(stream=stream)
+    filtered_logger.main()
+    filtered_logger.shutdown_logger(logger)
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 13
+    assert lines[-1].split(": ", 1)[1].startswith("exported 12 rows")
+    assert all("name=***; email=***;" in line for line in lines[:-1])
+    assert "Marlene Wood" not in stream.getvalue()
+
+
+def test_main_exports_existing_table(sqlite_settings, monkeypatch):
+    """ A database that has its users table already is not reseeded
+    """
+    connection = sqlite3.connect(str(sqlite_settings))
+    load_users_csv(connection, CSV_PATH)
+    connection.execute("DELETE FROM users WHERE rowid > 3;")
+    connection.commit()
+    connection.close()
+    stream = io.StringIO()
+    monkeypatch.setattr("sys.stderr", stream)
+    logger = filtered_logger.get_logger(stream=stream)
+    filtered_logger.main()
+    filtered_logger.shutdown_logger(logger)
+    assert "exported 3 rows" in stream.getvalue()
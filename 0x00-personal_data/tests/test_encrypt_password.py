@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+""" Tests of the hash policy checks of encrypt_password
+"""
+import pytest
+
+from encrypt_password import (
+    hash_password, is_valid, needs_rehash, verify_and_update)
+
+
+ROUNDS = 5
+
+
+@pytest.fixture(scope="module")
+def current():
+    """ A `$2b$` hash at the policy work factor
+    """
+    return hash_password("hunter2", ROUNDS)
+
+
+def test_hash_in_policy_is_kept(current):
+    """ A `$2b$` hash at the policy cost is not rehashed
+    """
+    assert not needs_rehash(current, ROUNDS)
+    assert verify_and_update(current, "hunter2", ROUNDS) == (True, None)
+
+
+@pytest.mark.parametrize("stored", [
+    lambda: hash_password("hunter2", ROUNDS - 1),
+    lambda: b'$2a$' + hash_password("hunter2", ROUNDS)[4:],
+], ids=["lower_cost", "2a_prefix"])
+def test_hash_out_of_policy_is_upgraded(stored):
+    """ A lower cost or `$2a$` hash gets a new hash that verifies
+    """
+    stored = stored()
+    assert needs_rehash(stored, ROUNDS)
+    valid, new_hash = verify_and_update(stored, "hunter2", ROUNDS)
+    assert valid
+    assert new_hash is not None and new_hash != stored
+    assert new_hash.startswith(b'$2b$05$')
+    assert not needs_rehash(new_hash, ROUNDS)
+    assert is_valid(new_hash, "hunter2")
+
+
+def test_wrong_password_is_not_upgraded():
+    """ A wrong password is rejected without a new hash
+    """
+    stored = hash_password("hunter2", ROUNDS - 1)
+    assert verify_and_update(stored, "hunter3", ROUNDS) == (False, None)
+
+
+@pytest.mark.parametrize("stored", [
+    b'', b'not a hash', b'$2b$xx$' + b'a' * 53, b'$1$abc$def'])
+def test_unparseable_hash_is_rejected(stored):
+    """ An unparseable hash is rejected instead of raising
+    """
+    assert needs_rehash(stored, ROUNDS)
+    assert verify_and_update(stored, "hunter2", ROUNDS) == (False, None)
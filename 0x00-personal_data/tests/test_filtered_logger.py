@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+""" Tests of the redaction backends and loggers of filtered_logger
+"""
+import csv
+import io
+import os
+import logging
+import threading
+
+import pytest
+
+from filtered_logger import (
+    PII_FIELDS, RedactingFormatter, dump_rows, filter_datum, format_row,
+    get_logger, log_rows, shutdown_logger, tokenize_datum)
+
+
+def user_rows():
+    """ The columns and rows of user_data.csv
+    """
+    path = os.path.join(os.path.dirname(__file__), os.pardir,
+                        "user_data.csv")
+    with open(path, newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        columns = next(reader)
+        return columns, list(reader)
+
+
+COLUMNS, ROWS = user_rows()
+
+
+@pytest.mark.parametrize("row", ROWS)
+@pytest.mark.parametrize("fields", [
+    PII_FIELDS, ("email",), ("name", "ip", "user_agent")])
+def test_tokenize_matches_filter_datum(fields, row):
+    """ Both backends redact user_data.csv rows the same way
+    """
+    message = format_row(COLUMNS, row)
+    assert tokenize_datum(frozenset(fields), "***", message, ";") == \
+        filter_datum(list(fields), "***", message, ";")
+
+
+@pytest.mark.parametrize("row", ROWS)
+def test_formatter_backends_match(row):
+    """ Both RedactingFormatter backends format a record the same way
+    """
+    record = logging.LogRecord("user_data", logging.INFO, None, None,
+                               format_row(COLUMNS, row), None, None)
+    regex = RedactingFormatter(PII_FIELDS)
+    tokenize = RedactingFormatter(PII_FIELDS, backend='tokenize')
+    assert tokenize.format(record) == regex.format(record)
+
+
+def test_tokenize_only_matches_whole_keys():
+    """ The regex redacts any key ending with a field, such as the
+    `name` of `username=`; the tokenizer only redacts whole keys
+    """
+    message = "username=bob; name=Bob;"
+    assert filter_datum(["name"], "***", message, ";") == \
+        "username=***; name=***;"
+    assert tokenize_datum(frozenset(["name"]), "***", message, ";") == \
+        "username=bob; name=***;"
+
+
+def test_unknown_backend():
+    """ RedactingFormatter rejects unknown backends
+    """
+    with pytest.raises(ValueError):
+        RedactingFormatter(PII_FIELDS, backend='unknown')
+
+
+def stream_logger(name, stream, backend='regex', propagate=False):
+    """ A logger writing redacted records to a stream
+    """
+    logger = logging.getLogger(name)
+    logger.handlers = []
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(RedactingFormatter(PII_FIELDS, backend))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = propagate
+    return logger
+
+
+@pytest.mark.parametrize("backend", RedactingFormatter.BACKENDS)
+def test_dump_rows_matches_log_rows(backend, monkeypatch):
+    """ The bulk path writes what the per-record path writes
+    """
+    monkeypatch.setattr(logging.Formatter, "formatTime",
+                        lambda self, record, datefmt=None: "now")
+    per_record, bulk = io.StringIO(), io.StringIO()
+    log_rows(stream_logger("test_log_rows", per_record, backend),
+             COLUMNS, ROWS)
+    dump_rows(stream_logger("test_dump_rows", bulk, backend),
+              COLUMNS, ROWS)
+    assert bulk.getvalue() == per_record.getvalue().replace(
+        "test_log_rows", "test_dump_rows")
+    assert len(bulk.getvalue().splitlines()) == len(ROWS)
+
+
+def test_dump_rows_propagates():
+    """ Records of a propagating logger still reach the parents
+    """
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    records = []
+    parent = logging.getLogger("test_dump_parent")
+    parent.handlers = [ListHandler()]
+    parent.propagate = False
+    logger = stream_logger("test_dump_parent.child", io.StringIO(),
+                           propagate=True)
+    dump_rows(logger, COLUMNS, ROWS)
+    assert len(records) == len(ROWS)
+
+
+def test_dump_rows_delayed_file_handler(tmp_path):
+    """ A FileHandler that has not opened its file yet is written
+    through the per-record path
+    """
+    logger = logging.getLogger("test_dump_delay")
+    logger.handlers = []
+    logger.propagate = False
+    handler = logging.FileHandler(str(tmp_path / "audit.log"), delay=True)
+    handler.setFormatter(RedactingFormatter(PII_FIELDS))
+    logger.addHandler(handler)
+    try:
+        dump_rows(logger, COLUMNS, ROWS)
+    finally:
+        handler.close()
+    lines = (tmp_path / "audit.log").read_text().splitlines()
+    assert len(lines) == len(ROWS)
+    assert "email=***;" in lines[0]
+
+
+def test_dump_rows_write_error(monkeypatch):
+    """ A failing write goes through handleError instead of raising
+    """
+    class BrokenStream(io.StringIO):
+        def write(self, text):
+            raise OSError("disk full")
+
+    errors = []
+    logger = stream_logger("test_dump_broken", BrokenStream())
+    monkeypatch.setattr(logger.handlers[0], "handleError", errors.append)
+    dump_rows(logger, COLUMNS, ROWS)
+    assert len(errors) == 1
+
+
+@pytest.mark.parametrize("overflow", ["count", "drop_oldest"])
+def test_async_drops_are_counted(overflow):
+    """ Every record logged from many threads is either written or
+    counted as dropped
+    """
+    stream = io.StringIO()
+    logger = get_logger("test_async_{}".format(overflow), stream=stream,
+                        async_mode=True, queue_size=4, overflow=overflow)
+    handler = logger.handlers[0]
+
+    def log_many():
+        for i in range(500):
+            logger.info("name=Bob; ip=%d;", i)
+
+    threads = [threading.Thread(target=log_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    shutdown_logger(logger)
+    written = len(stream.getvalue().splitlines())
+    assert written + handler.dropped == 8 * 500
+    assert "name=***;" in stream.getvalue()
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+def test_get_logger_is_idempotent(async_mode, monkeypatch):
+    """ Calling get_logger again keeps one handler, and a record is
+    still formatted once
+    """
+    formats = []
+    format_record = RedactingFormatter.format
+    monkeypatch.setattr(RedactingFormatter, "format", lambda self, record:
+                        formats.append(record) or format_record(self, record))
+    stream = io.StringIO()
+    name = "test_idempotent_{}".format(async_mode)
+    for calls in range(1, 11):
+        logger = get_logger(name, stream=stream, async_mode=async_mode)
+        assert len(logger.handlers) == 1
+        logger.info("name=Bob;")
+        if async_mode:
+            logger.handlers[0].listener.queue.join()
+        assert len(formats) == calls
+    shutdown_logger(logger)
+    assert stream.getvalue().count("name=***;") == 10
+
+
+def test_get_logger_after_shutdown():
+    """ A logger shut down is rebuilt by the next get_logger call
+    instead of queueing records nobody writes
+    """
+    stream = io.StringIO()
+    logger = get_logger("test_restart", stream=stream, async_mode=True,
+                        queue_size=1, overflow="block")
+    shutdown_logger(logger)
+    assert logger.handlers == []
+    logger = get_logger("test_restart", stream=stream, async_mode=True,
+                        queue_size=1, overflow="block")
+    assert len(logger.handlers) == 1
+    for _ in range(3):
+        logger.info("ssn=123;")
+    shutdown_logger(logger)
+    assert stream.getvalue().count("ssn=***;") == 3
@@ -6,21 +6,48 @@ from os import getenv
 from api.v1.views import app_views
 from flask import Flask, jsonify, abort, request
 from flask_cors import (CORS, cross_origin)
-from api.v1.auth.auth import Auth
+from api.v1.auth.auth import Auth, stage_histogram
 from api.v1.auth.basic_auth import BasicAuth
+from api.v1.auth.session_auth import SessionAuth
+from api.v1.auth.session_exp_auth import SessionExpAuth
+from api.v1.auth.session_db_auth import SessionDBAuth
+from models.metrics import timed
+from time import perf_counter
 
 app = Flask(__name__)
 app.register_blueprint(app_views)
 CORS(app, resources={r"/api/v1/*": {"origins": "*"}})
 
+# time every view of the API
+for endpoint, view in list(app.view_functions.items()):
+    if endpoint.startswith(app_views.name + "."):
+        app.view_functions[endpoint] = timed(
+            "view_seconds", "Time spent in each view", view=endpoint)(view)
+
+
+# paths reachable without authentication, a `*` matching anything
+EXCLUDED_PATHS = [
+    "/api/v1/status/",
+    "/api/v1/unauthorized/",
+    "/api/v1/forbidden/",
+    "/api/v1/auth_session/login/"]
+
+PRESENCE_SECONDS = stage_histogram("presence")
+CURRENT_USER_SECONDS = stage_histogram("current_user")
 
 auth = None
 auth_type = getenv("AUTH_TYPE")
 
 if auth_type == "basic_auth":
-    auth = BasicAuth()
+    auth = BasicAuth(EXCLUDED_PATHS)
+elif auth_type == "session_auth":
+    auth = SessionAuth(EXCLUDED_PATHS)
+elif auth_type == "session_exp_auth":
+    auth = SessionExpAuth(EXCLUDED_PATHS)
+elif auth_type == "session_db_auth":
+    auth = SessionDBAuth(EXCLUDED_PATHS)
 else:
-    auth = Auth()
+    auth = Auth(EXCLUDED_PATHS)
 
 
 @app.errorhandler(404)
@@ -45,16 +72,20 @@ def forbidden(error) -> str:
 def authenticate_user():
     """Authenticates the user before processing a request."""
     if auth:
-        excluded_paths = [
-            "/api/v1/status/",
-            "/api/v1/unauthorized/",
-            "/api/v1/forbidden/",
-            "/api/v1/auth_session/login/",]
-        if auth.require_auth(request.path, excluded_paths):
-            user = auth.current_user(request)
-            if auth.authorization_header(request) is None and \
-                    auth.session_cookie(request) is None:
+        if auth.require_auth(request.path, EXCLUDED_PATHS):
+            # requests without any credentials get their 401 before
+            # current_user decodes, looks up or hashes anything
+            start = perf_counter()
+            header = auth.authorization_header(request)
+            present = header is not None or \
+                auth.session_cookie(request) is not None
+            checked = perf_counter()
+            PRESENCE_SECONDS.observe(checked - start)
+            if not present:
                 abort(401)
+            # the header read above is passed on, not read again
+            user = auth.current_user(request, header=header)
+            CURRENT_USER_SECONDS.observe(perf_counter() - checked)
             if user is None:
                 abort(403)
             request.current_user = user
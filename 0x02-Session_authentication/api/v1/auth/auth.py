@@ -3,17 +3,42 @@
 Auth module for API authentication management.
 """
 from flask import request
+from os import getenv
 from typing import List, TypeVar
+from api.v1.auth.path_matcher import compile_paths
+from models.metrics import Histogram, histogram, timed
+
+
+def stage_histogram(stage: str) -> Histogram:
+    """
+    Histogram of the time spent in one stage of the authentication.
+    """
+    return histogram("auth_stage_seconds",
+                     "Time spent in each authentication stage", stage=stage)
 
 
 class Auth:
     """Class to manage the API authentication"""
 
+    excluded_paths = None
+    _matcher = None
+
+    def __init__(self, excluded_paths: List[str] = None):
+        """
+        Creates an Auth, compiling the paths that never require
+        authentication when they are given.
+        """
+        if excluded_paths is not None:
+            self.excluded_paths = excluded_paths
+            self._matcher = compile_paths(tuple(excluded_paths))
+
+    @timed("auth_stage_seconds", "Time spent in each authentication stage",
+           stage="require_auth")
     def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
         """
-        Determines if authentication is required for a given path.
-        Returns:
-            bool: False for now. (Logic to be implemented later)
+        Determines if authentication is required for a given path:
+        False when it is one of excluded_paths, with or without its
+        trailing slash. A `*` in an excluded path matches anything.
         """
         if path is None:
             return True
@@ -21,17 +46,11 @@ class Auth:
         if excluded_paths is None or len(excluded_paths) == 0:
             return True
 
-        if path[-1] != '/':
-            path += '/'
-
-        for excluded_path in excluded_paths:
-            if excluded_path[-1] != '/':
-                excluded_path += '/'
-
-            if path == excluded_path:
-                return False
-
-        return True
+        if excluded_paths is self.excluded_paths:
+            matcher = self._matcher
+        else:
+            matcher = compile_paths(tuple(excluded_paths))
+        return not matcher.match(path)
 
     def authorization_header(self, request=None) -> str:
         """
@@ -45,10 +64,23 @@ class Auth:
         auth_header = request.headers.get("Authorization", None)
         return auth_header
 
-    def current_user(self, request=None) -> TypeVar('User'):
+    def current_user(self, request=None, header: str = None
+                     ) -> TypeVar('User'):
         """
         Retrieves the current user based on the request.
+        header is the Authorization header of the request when the
+        caller already read it.
         Returns:
             TypeVar('User'): None for now.
         """
         return None
+
+    def session_cookie(self, request=None) -> str:
+        """
+        Retrieves the session cookie, named by SESSION_NAME,
+        from the request object.
+        """
+        if request is None:
+            return None
+
+        return request.cookies.get(getenv("SESSION_NAME"))
@@ -3,14 +3,29 @@
 BasicAuth module for API authentication.
 """
 import base64
-from typing import TypeVar
+from time import perf_counter
+from typing import List, TypeVar
 from models.user import User
-from api.v1.auth.auth import Auth
+from api.v1.auth.auth import Auth, stage_histogram
+from api.v1.auth.credential_cache import CredentialCache
+
+
+CACHE_SECONDS = stage_histogram("cache")
+PARSE_SECONDS = stage_histogram("parse")
+LOOKUP_SECONDS = stage_histogram("lookup")
+VERIFY_SECONDS = stage_histogram("verify")
 
 
 class BasicAuth(Auth):
     """ BasicAuth class that inherits from Auth. """
 
+    def __init__(self, excluded_paths: List[str] = None):
+        """
+        Creates a BasicAuth remembering verified credentials.
+        """
+        super().__init__(excluded_paths)
+        self.credential_cache = CredentialCache()
+
     def extract_base64_authorization_header(
            self, authorization_header: str) -> str:
         """
@@ -67,23 +82,45 @@ class BasicAuth(Auth):
         """
         result = None
         while type(user_email) == str and type(user_pwd) == str:
+            start = perf_counter()
             try:
                 users = User.search({'email': user_email})
             except Exception:
                 break
+            looked_up = perf_counter()
+            LOOKUP_SECONDS.observe(looked_up - start)
             while len(users) > 0:
                 if users[0].is_valid_password(user_pwd):
                     result = users[0]
+                VERIFY_SECONDS.observe(perf_counter() - looked_up)
                 break
             break
         return result
 
-    def current_user(self, request=None) -> TypeVar('User'):
+    def current_user(self, request=None, header: str = None
+                     ) -> TypeVar('User'):
         """
         Gets user from request using methods with while loops.
+        header is the Authorization header when the caller already
+        read it, so it is not read twice.
         """
-        auth_header = self.authorization_header(request)
+        auth_header = header
+        if auth_header is None:
+            auth_header = self.authorization_header(request)
+        start = perf_counter()
+        user = self.credential_cache.get(auth_header)
+        cached = perf_counter()
+        CACHE_SECONDS.observe(cached - start)
+        if user is not None:
+            return user
+        start = cached
         b64_auth_header = self.extract_base64_authorization_header(auth_header)
         d_auth_head = self.decode_base64_authorization_header(b64_auth_header)
         email, password = self.extract_user_credentials(d_auth_head)
-        return self.user_object_from_credentials(email, password)
+        PARSE_SECONDS.observe(perf_counter() - start)
+        if email is None:
+            return None
+        user = self.user_object_from_credentials(email, password)
+        if user is not None:
+            self.credential_cache.put(auth_header, user)
+        return user
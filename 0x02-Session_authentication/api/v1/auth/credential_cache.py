@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+CredentialCache module for remembering verified credentials.
+"""
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TypeVar
+from models.metrics import counter
+from models.user import User
+
+
+# seconds a verified Authorization header is trusted, and the number
+# of headers remembered; 0 for either one disables the cache
+CACHE_TTL = float(os.getenv("BASIC_AUTH_CACHE_TTL", "60"))
+CACHE_SIZE = int(os.getenv("BASIC_AUTH_CACHE_SIZE", "1024"))
+
+# hits and misses of every cache of the process, at /api/v1/metrics
+HITS = counter("basic_auth_cache_hits_total",
+               "Authorization headers found verified in the cache")
+MISSES = counter("basic_auth_cache_misses_total",
+                 "Authorization headers not in the cache, or no longer valid")
+
+
+class CredentialCache:
+    """
+    Bounded cache of verified Authorization headers, each one mapped
+    to the id of its user for `ttl` seconds. Headers are stored as an
+    HMAC under a per-process secret, never in clear. An entry is only
+    used while its user still exists with the same email and password.
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL, size: int = CACHE_SIZE):
+        """
+        Creates an empty cache of at most `size` headers.
+        """
+        self.ttl = ttl
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._secret = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, header: str) -> bytes:
+        """
+        Keyed digest of an Authorization header.
+        """
+        return hmac.new(self._secret, header.encode('utf-8'),
+                        hashlib.sha256).digest()
+
+    def get(self, header: str) -> TypeVar('User'):
+        """
+        Returns the user of a verified header, or None.
+        """
+        if self.ttl <= 0 or self.size <= 0 or type(header) is not str:
+            return None
+        key = self._key(header)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        user = None
+        if entry is not None and entry[3] > time.monotonic():
+            user = User.get(entry[0])
+        if user is None or user.email != entry[1] or \
+                user.password != entry[2]:
+            with self._lock:
+                if entry is not None:
+                    self._entries.pop(key, None)
+                self.misses += 1
+            MISSES.inc()
+            return None
+        with self._lock:
+            self.hits += 1
+        HITS.inc()
+        return user
+
+    def put(self, header: str, user: TypeVar('User')):
+        """
+        Remembers that a header was verified as the credentials
+        of a user.
+        """
+        if self.ttl <= 0 or self.size <= 0 or type(header) is not str:
+            return
+        key = self._key(header)
+        entry = (user.id, user.email, user.password,
+                 time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
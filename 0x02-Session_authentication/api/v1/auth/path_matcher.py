@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+PathMatcher module for matching request paths against excluded paths.
+"""
+import re
+from functools import lru_cache
+from typing import Iterable, Tuple
+
+
+# key marking the end of a prefix in the trie: never a path character
+_END = ""
+
+
+class PathMatcher:
+    """
+    Excluded paths compiled once for fast lookups. Paths match with
+    or without their trailing slash, and `*` matches any characters:
+    exact paths are kept in a frozenset, paths ending with their only
+    `*` in a prefix trie, and the other patterns in one regex.
+    """
+
+    def __init__(self, excluded_paths: Iterable[str]):
+        """
+        Compiles a list of excluded paths.
+        """
+        exact = set()
+        patterns = []
+        self._trie = {}
+        for excluded_path in excluded_paths:
+            if not isinstance(excluded_path, str) or excluded_path == "":
+                continue
+            if excluded_path[-1] != '*' and excluded_path[-1] != '/':
+                excluded_path += '/'
+            star = excluded_path.find('*')
+            if star == -1:
+                exact.add(excluded_path)
+            elif star == len(excluded_path) - 1:
+                node = self._trie
+                for char in excluded_path[:-1]:
+                    node = node.setdefault(char, {})
+                node[_END] = True
+            else:
+                patterns.append(".*".join(
+                    re.escape(part) for part in excluded_path.split('*')))
+        self._exact = frozenset(exact)
+        self._pattern = None
+        if len(patterns) > 0:
+            self._pattern = re.compile("|".join(
+                "(?:{})".format(pattern) for pattern in patterns))
+
+    def match(self, path: str) -> bool:
+        """
+        Tells if a path is one of the excluded paths.
+        """
+        if path[-1:] != '/':
+            path += '/'
+        if path in self._exact:
+            return True
+        node = self._trie
+        for char in path:
+            if _END in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                break
+        else:
+            if _END in node:
+                return True
+        if self._pattern is not None:
+            return self._pattern.fullmatch(path) is not None
+        return False
+
+
+@lru_cache(maxsize=32)
+def compile_paths(excluded_paths: Tuple[str, ...]) -> PathMatcher:
+    """
+    Returns the PathMatcher of a tuple of excluded paths, compiled
+    once per distinct tuple.
+    """
+    return PathMatcher(excluded_paths)
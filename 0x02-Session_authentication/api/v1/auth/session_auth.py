@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+SessionAuth module for API authentication with session cookies.
+"""
+import threading
+import uuid
+from typing import List, TypeVar
+from models.user import User
+from api.v1.auth.auth import Auth
+
+
+class SessionAuth(Auth):
+    """ SessionAuth class keeping sessions in memory. """
+
+    user_id_by_session_id = {}
+
+    def __init__(self, excluded_paths: List[str] = None):
+        """
+        Creates a SessionAuth with its own sessions.
+        """
+        super().__init__(excluded_paths)
+        self.user_id_by_session_id = {}
+        self._lock = threading.Lock()
+
+    def create_session(self, user_id: str = None) -> str:
+        """
+        Creates a session for a user and returns its id.
+        """
+        if user_id is None or not isinstance(user_id, str):
+            return None
+
+        session_id = str(uuid.uuid4())
+        with self._lock:
+            self.user_id_by_session_id[session_id] = user_id
+        return session_id
+
+    def user_id_for_session_id(self, session_id: str = None) -> str:
+        """
+        Returns the user id of a session.
+        """
+        if session_id is None or not isinstance(session_id, str):
+            return None
+
+        return self.user_id_by_session_id.get(session_id)
+
+    def current_user(self, request=None, header: str = None
+                     ) -> TypeVar('User'):
+        """
+        Gets the user of the session cookie of a request; the
+        Authorization header is not used.
+        """
+        user_id = self.user_id_for_session_id(self.session_cookie(request))
+        if user_id is None:
+            return None
+
+        return User.get(user_id)
+
+    def destroy_session(self, request=None) -> bool:
+        """
+        Deletes the session of a request, the user logging out.
+        """
+        session_id = self.session_cookie(request)
+        if self.user_id_for_session_id(session_id) is None:
+            return False
+
+        with self._lock:
+            self.user_id_by_session_id.pop(session_id, None)
+        return True
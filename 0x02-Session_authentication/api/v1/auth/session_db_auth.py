@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+SessionDBAuth module for API authentication with stored sessions.
+"""
+import uuid
+from typing import List
+from models.user_session import UserSession
+from api.v1.auth.session_exp_auth import SessionExpAuth
+
+
+class SessionDBAuth(SessionExpAuth):
+    """
+    SessionExpAuth class keeping sessions as UserSession objects
+    in the storage, so they survive restarts and are shared by
+    every process of the API.
+    """
+
+    def __init__(self, excluded_paths: List[str] = None):
+        """
+        Creates a SessionDBAuth, scheduling the expiration
+        of the stored sessions.
+        """
+        super().__init__(excluded_paths)
+        UserSession.load_from_file()
+        for user_session in UserSession.all():
+            self._schedule(user_session.session_id, user_session.created_at)
+
+    def _forget(self, session_id: str):
+        """
+        Deletes an expired session from the storage.
+        """
+        for user_session in UserSession.search({'session_id': session_id}):
+            if self.expired(user_session.created_at):
+                user_session.remove()
+
+    def create_session(self, user_id: str = None) -> str:
+        """
+        Creates and stores a session for a user and returns its id.
+        """
+        if user_id is None or not isinstance(user_id, str):
+            return None
+
+        user_session = UserSession(user_id=user_id,
+                                   session_id=str(uuid.uuid4()))
+        user_session.save()
+        self._schedule(user_session.session_id, user_session.created_at)
+        return user_session.session_id
+
+    def user_id_for_session_id(self, session_id: str = None) -> str:
+        """
+        Returns the user id of a stored session that has not expired.
+        """
+        if session_id is None or not isinstance(session_id, str):
+            return None
+
+        self.expire_sessions()
+        for user_session in UserSession.search({'session_id': session_id}):
+            if self.expired(user_session.created_at):
+                # created by another process: not in our heap
+                user_session.remove()
+                return None
+            return user_session.user_id
+        return None
+
+    def destroy_session(self, request=None) -> bool:
+        """
+        Deletes the stored session of a request, the user logging out.
+        """
+        session_id = self.session_cookie(request)
+        if session_id is None:
+            return False
+
+        user_sessions = UserSession.search({'session_id': session_id})
+        for user_session in user_sessions:
+            user_session.remove()
+        return len(user_sessions) > 0
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+SessionExpAuth module for API authentication with expiring sessions.
+"""
+import heapq
+from datetime import datetime, timedelta
+from os import getenv
+from typing import List
+from api.v1.auth.session_auth import SessionAuth
+
+
+class SessionExpAuth(SessionAuth):
+    """
+    SessionAuth class whose sessions expire SESSION_DURATION seconds
+    after their creation (never when it is 0 or not set). Expiration
+    times are kept in a heap, so expired sessions are forgotten
+    earliest first without scanning every session.
+    """
+
+    def __init__(self, excluded_paths: List[str] = None):
+        """
+        Creates a SessionExpAuth reading SESSION_DURATION.
+        """
+        super().__init__(excluded_paths)
+        try:
+            self.session_duration = int(getenv("SESSION_DURATION", "0"))
+        except ValueError:
+            self.session_duration = 0
+        self._expirations = []
+
+    def _schedule(self, session_id: str, created_at: datetime):
+        """
+        Remembers when a session created at created_at expires.
+        """
+        if self.session_duration <= 0:
+            return
+        with self._lock:
+            heapq.heappush(self._expirations, (
+                created_at + timedelta(seconds=self.session_duration),
+                session_id))
+
+    def expired(self, created_at: datetime) -> bool:
+        """
+        Tells if a session created at created_at has expired.
+        """
+        if self.session_duration <= 0:
+            return False
+        if created_at is None:
+            return True
+        return created_at + timedelta(seconds=self.session_duration) < \
+            datetime.utcnow()
+
+    def expire_sessions(self):
+        """
+        Forgets every session that has expired.
+        """
+        now = datetime.utcnow()
+        while True:
+            with self._lock:
+                if len(self._expirations) == 0 or \
+                        self._expirations[0][0] >= now:
+                    return
+                session_id = heapq.heappop(self._expirations)[1]
+            self._forget(session_id)
+
+    def _forget(self, session_id: str):
+        """
+        Deletes an expired session.
+        """
+        with self._lock:
+            session = self.user_id_by_session_id.get(session_id)
+            if session is not None and self.expired(
+                    session.get('created_at')):
+                del self.user_id_by_session_id[session_id]
+
+    def create_session(self, user_id: str = None) -> str:
+        """
+        Creates a session for a user and returns its id.
+        """
+        session_id = super().create_session(user_id)
+        if session_id is None:
+            return None
+
+        created_at = datetime.utcnow()
+        with self._lock:
+            self.user_id_by_session_id[session_id] = {
+                'user_id': user_id, 'created_at': created_at}
+        self._schedule(session_id, created_at)
+        return session_id
+
+    def user_id_for_session_id(self, session_id: str = None) -> str:
+        """
+        Returns the user id of a session that has not expired.
+        """
+        if session_id is None or not isinstance(session_id, str):
+            return None
+
+        self.expire_sessions()
+        session = self.user_id_by_session_id.get(session_id)
+        if session is None or self.expired(session.get('created_at')):
+            return None
+        return session.get('user_id')
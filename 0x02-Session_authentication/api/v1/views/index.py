@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """ Module of Index views """
-from flask import jsonify, abort
+from flask import Response, jsonify, abort
 from api.v1.views import app_views
+from models import metrics
 
 
 @app_views.route('/status', methods=['GET'], strict_slashes=False)
@@ -25,6 +26,19 @@ def stats() -> str:
     return jsonify(stats)
 
 
+@app_views.route('/metrics', methods=['GET'], strict_slashes=False)
+def view_metrics() -> str:
+    """ GET /api/v1/metrics
+    Return:
+      - the latency histograms in the Prometheus text format
+      - 404 if metrics are disabled (METRICS_ENABLED=0)
+    """
+    if not metrics.ENABLED:
+        abort(404)
+    return Response(metrics.render(),
+                    mimetype="text/plain; version=0.0.4")
+
+
 @app_views.route('/unauthorized', methods=['GET'], strict_slashes=False)
 def unauthorized() -> str:
     """ GET /api/v1/unauthorized
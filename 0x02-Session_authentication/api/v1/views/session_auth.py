@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+""" Module of Session authentication views
+"""
+from api.v1.views import app_views
+from api.v1.auth.session_auth import SessionAuth
+from flask import abort, jsonify, request
+from models.user import User
+from os import getenv
+
+
+@app_views.route('/auth_session/login', methods=['POST'],
+                 strict_slashes=False)
+def session_login() -> str:
+    """ POST /api/v1/auth_session/login
+    Form data:
+      - email
+      - password
+    Return:
+      - User object JSON represented, with the session cookie
+      - 400 if email or password is missing
+      - 404 if no User has this email
+      - 401 if the password is wrong
+      - 404 if the API does not use session authentication
+    """
+    from api.v1.app import auth
+    if not isinstance(auth, SessionAuth):
+        abort(404)
+    email = request.form.get('email')
+    if email is None or email == "":
+        return jsonify({"error": "email missing"}), 400
+    password = request.form.get('password')
+    if password is None or password == "":
+        return jsonify({"error": "password missing"}), 400
+    try:
+        users = User.search({'email': email})
+    except Exception:
+        users = []
+    if len(users) == 0:
+        return jsonify({"error": "no user found for this email"}), 404
+    user = users[0]
+    if not user.is_valid_password(password):
+        return jsonify({"error": "wrong password"}), 401
+
+    session_id = auth.create_session(user.id)
+    response = jsonify(user.to_json())
+    response.set_cookie(getenv("SESSION_NAME"), session_id)
+    return response
+
+
+@app_views.route('/auth_session/logout', methods=['DELETE'],
+                 strict_slashes=False)
+def session_logout() -> str:
+    """ DELETE /api/v1/auth_session/logout
+    Return:
+      - empty JSON if the session has been correctly deleted
+      - 404 if the request has no valid session, or if the API
+        does not use session authentication
+    """
+    from api.v1.app import auth
+    if not isinstance(auth, SessionAuth) or \
+            not auth.destroy_session(request):
+        abort(404)
+    return jsonify({}), 200
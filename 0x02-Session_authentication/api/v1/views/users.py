@@ -2,18 +2,89 @@
 """ Module of Users views
 """
 from api.v1.views import app_views
-from flask import abort, jsonify, request
+from flask import Response, abort, jsonify, request, stream_with_context
 from models.user import User
+from typing import Iterator, List, Optional
+import json
+
+
+# users serialized per chunk of a streamed list
+STREAM_BATCH_SIZE = 100
+FORMATS = {'json': "application/json", 'ndjson': "application/x-ndjson"}
+_encode = json.JSONEncoder(sort_keys=True, separators=(",", ":")).encode
+
+
+def _stream_users(users: List[User], fields: Optional[List[str]],
+                  ndjson: bool) -> Iterator[str]:
+    """ Serialize users as a JSON list, or one JSON object per line,
+    a chunk of STREAM_BATCH_SIZE users at a time
+    """
+    separator = "" if ndjson else ","
+    terminator = "\n" if ndjson else ""
+    prefix = ""
+    batch = []
+    if not ndjson:
+        yield "["
+    for user in users:
+        user_json = user.to_json()
+        if fields is not None:
+            user_json = {k: user_json[k] for k in fields if k in user_json}
+        batch.append(_encode(user_json) + terminator)
+        if len(batch) == STREAM_BATCH_SIZE:
+            yield prefix + separator.join(batch)
+            prefix, batch = separator, []
+    if len(batch) > 0:
+        yield prefix + separator.join(batch)
+    if not ndjson:
+        yield "]"
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def view_all_users() -> str:
     """ GET /api/v1/users
+    Query parameters (optional):
+      - limit: maximum number of users to return; the cursor of
+        the next page, if any, is in the X-Next-Cursor header
+      - cursor: X-Next-Cursor of the previous page
+      - fields: comma separated attributes to return (ex: id,email)
+      - format: json (a JSON list, default) or ndjson (one JSON
+        object per line)
+    Pages (with a limit or a cursor) list users by id: the cursor is
+    the last id returned and the next page starts after it, so users
+    created or deleted meanwhile never shift the pages
     Return:
-      - list of all User objects JSON represented
+      - list of all User objects JSON represented, streamed
+      - 400 if a parameter is invalid
     """
-    all_users = [user.to_json() for user in User.all()]
-    return jsonify(all_users)
+    cursor = request.args.get('cursor')
+    try:
+        limit = request.args.get('limit')
+        limit = None if limit is None else int(limit)
+    except ValueError:
+        return jsonify({'error': "Invalid limit or cursor"}), 400
+    if limit is not None and limit <= 0:
+        return jsonify({'error': "Invalid limit or cursor"}), 400
+    output = request.args.get('format', 'json')
+    if output not in FORMATS:
+        return jsonify({'error': "Unknown format"}), 400
+    fields = request.args.get('fields')
+    if fields is not None:
+        fields = [field for field in fields.split(',') if field != ""]
+
+    next_cursor = None
+    if limit is None and cursor is None:
+        users = User.all()
+    else:
+        # one more user than the page tells if a next page follows
+        users = User.page(cursor, None if limit is None else limit + 1)
+        if limit is not None and len(users) > limit:
+            users = users[:limit]
+            next_cursor = users[-1].id
+    response = Response(stream_with_context(_stream_users(
+        users, fields, output == 'ndjson')), mimetype=FORMATS[output])
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
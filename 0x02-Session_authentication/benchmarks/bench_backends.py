@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+""" Benchmark of the storage backends: saves/s, gets/s and
+searches/s by email of each one, in a new directory
+Usage: ./bench_backends.py [users]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+import models.base  # noqa: E402
+from models.engine import BACKENDS, get_storage  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def rate(func, values: list) -> float:
+    """ Calls per second of func over values
+    """
+    start = time.perf_counter()
+    for value in values:
+        func(value)
+    models.base.flush()
+    return len(values) / (time.perf_counter() - start)
+
+
+def main():
+    """ Time each operation on each backend
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print("{:<8} {:>10} {:>10} {:>12}".format(
+        "backend", "saves/s", "gets/s", "searches/s"))
+    for name in BACKENDS:
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            os.environ["STORAGE_SQLITE_PATH"] = "db.sqlite3"
+            models.base.storage = get_storage(name)
+            users = [User(email="user{}@example.com".format(i))
+                     for i in range(count)]
+            saves = rate(User.save, users)
+            gets = rate(User.get, [user.id for user in users])
+            searches = rate(lambda user: User.search({'email': user.email}),
+                            users)
+            print("{:<8} {:>10.0f} {:>10.0f} {:>12.0f}".format(
+                name, saves, gets, searches))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+""" Benchmark of Basic authentication: requests/s of an authenticated
+GET /api/v1/stats through the Flask test client, with the verified
+credential cache on and off
+Usage: ./bench_basic_auth.py [requests] [users]
+"""
+import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.environ["AUTH_TYPE"] = "basic_auth"
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+from api.v1 import app as app_module  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def rate(client, requests: int, headers: dict) -> float:
+    """ Requests per second of GET /api/v1/stats
+    """
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get("/api/v1/stats", headers=headers)
+        assert response.status_code == 200, response.status_code
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    """ Time requests of one client with the cache on and off
+    """
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    for i in range(count):
+        user = User(email="user{}@example.com".format(i))
+        user.password = "password{}".format(i)
+        user.save()
+    credentials = base64.b64encode(b"user7@example.com:password7")
+    headers = {"Authorization": "Basic " + credentials.decode()}
+    client = app_module.app.test_client()
+    cache = app_module.auth.credential_cache
+    ttl = cache.ttl
+    for name, cache_ttl in (("off", 0), ("on", ttl)):
+        cache.ttl = cache_ttl
+        cache.hits = cache.misses = 0
+        print("cache {:<4} {:>8.0f} req/s ({} hits, {} misses)".format(
+            name, rate(client, requests, headers), cache.hits,
+            cache.misses))
+
+
+if __name__ == "__main__":
+    main()
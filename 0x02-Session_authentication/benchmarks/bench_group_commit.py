@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+""" Benchmark of the json storage writes: saves/s of write-through
+(a snapshot written per save) against group commit, from several
+threads, with the time of the last flush included
+Usage: ./bench_group_commit.py [users] [threads] [interval]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+import models.base  # noqa: E402
+from models.engine import file_storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def run(users: int, threads: int) -> float:
+    """ Save users from threads into a new storage, return saves/s
+    """
+    models.base.storage = FileStorage()
+
+    def save_many():
+        for _ in range(users // threads):
+            User(email="bench@example.com").save()
+
+    workers = [threading.Thread(target=save_many) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    models.base.flush()
+    return users // threads * threads / (time.perf_counter() - start)
+
+
+def main():
+    """ Time both modes, each in a new directory
+    """
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    interval = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+    for name, flush_interval in (("write-through", 0),
+                                 ("group commit", interval)):
+        file_storage.FLUSH_INTERVAL = flush_interval
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            print("{:<14} {:>10.0f} saves/s".format(
+                name, run(users, threads)))
+
+
+if __name__ == "__main__":
+    main()
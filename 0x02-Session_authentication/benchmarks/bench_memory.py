@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+""" Benchmark of the memory used per User: the __slots__ model
+against the per instance __dict__ one it replaced
+Usage: ./bench_memory.py [users]
+"""
+import os
+import sys
+import tracemalloc
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+from models.user import User  # noqa: E402
+
+
+class DictUser():
+    """ The attributes of a User kept in a __dict__, as before
+    """
+
+    def __init__(self, **kwargs):
+        """ Initialize a DictUser instance
+        """
+        self.id = kwargs.get('id', str(uuid.uuid4()))
+        self.created_at = datetime.utcnow()
+        self.updated_at = datetime.utcnow()
+        self.email = kwargs.get('email')
+        self._password = kwargs.get('_password')
+        self.first_name = kwargs.get('first_name')
+        self.last_name = kwargs.get('last_name')
+
+
+def bytes_per_user(cls: type, count: int) -> tuple:
+    """ Memory allocated per object for count objects of cls, with
+    their attribute values, and the size of one object alone
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    users = [cls(email="user{}@example.com".format(i), _password="0" * 64,
+                 first_name="First", last_name="Last{}".format(i))
+             for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    user = users[0]
+    size = sys.getsizeof(user)
+    if hasattr(user, '__dict__'):
+        size += sys.getsizeof(user.__dict__)
+    return used / count, size
+
+
+def main():
+    """ Print the bytes per user of both models
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print("{:<10} {:>10} {:>12}".format("", "bytes/user", "object only"))
+    for name, cls in (("__dict__", DictUser), ("__slots__", User)):
+        print("{:<10} {:>10.0f} {:>12}".format(
+            name, *bytes_per_user(cls, count)))
+
+
+if __name__ == "__main__":
+    main()
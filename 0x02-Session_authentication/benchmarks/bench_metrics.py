@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+""" Benchmark of the metrics overhead on an authenticated
+GET /api/v1/users/<id> (Basic auth, memory storage):
+- measured: CPU time per request in new processes with
+  METRICS_ENABLED=0 and METRICS_ENABLED=1, alternating, each
+  process keeping its best batch of requests;
+- estimated: metrics recorded per request times the cost of one
+  timed call, which does not suffer from the noise of a shared
+  machine as the measured difference does
+Usage: ./bench_metrics.py [requests per batch] [rounds]
+"""
+import base64
+import os
+import subprocess
+import sys
+import time
+import timeit
+
+PROJECT = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                       os.pardir))
+sys.path.insert(0, PROJECT)
+
+
+def recorded() -> int:
+    """ Number of values and events recorded by every metric
+    """
+    from models.metrics import REGISTRY
+    return sum(metric.count if metric.type == "histogram" else
+               metric.value for metric in list(REGISTRY.values()))
+
+
+def worker(requests: int, batches: int = 20):
+    """ Time batches of requests in this process: print the CPU
+    microseconds per request of the best batch, and the number of
+    metrics recorded per request
+    """
+    from api.v1.app import app
+    from models.user import User
+    user = User(email="bob@example.com")
+    user.password = "secret"
+    user.save()
+    credentials = base64.b64encode(b"bob@example.com:secret").decode()
+    headers = {"Authorization": "Basic " + credentials}
+    path = "/api/v1/users/{}".format(user.id)
+    client = app.test_client()
+    assert client.get(path, headers=headers).status_code == 200
+    best = float("inf")
+    before = recorded()
+    for _ in range(batches):
+        start = time.process_time()
+        for _ in range(requests):
+            client.get(path, headers=headers)
+        best = min(best, time.process_time() - start)
+    print(best / requests * 1e6,
+          (recorded() - before) / (requests * batches))
+
+
+def timed_call_cost() -> float:
+    """ Microseconds a timed wrapper adds to a call
+    """
+    from models.metrics import timed
+
+    def view():
+        return None
+    wrapped = timed("bench_seconds", "Benchmark")(view)
+    number = 200000
+    return (min(timeit.repeat(wrapped, number=number, repeat=5)) -
+            min(timeit.repeat(view, number=number, repeat=5))) / \
+        number * 1e6
+
+
+def main():
+    """ Run the worker with metrics off and on, several rounds
+    """
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    best, events = {}, 0
+    for _ in range(rounds):
+        for enabled in ("0", "1"):
+            env = dict(os.environ, STORAGE_BACKEND="memory",
+                       AUTH_TYPE="basic_auth", METRICS_ENABLED=enabled,
+                       PYTHONPATH=PROJECT)
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker",
+                 str(requests)], env=env, check=True,
+                stdout=subprocess.PIPE, universal_newlines=True
+            ).stdout.split()
+            best[enabled] = min(best.get(enabled, float("inf")),
+                                float(output[0]))
+            if enabled == "1":
+                events = float(output[1])
+    for enabled, name in (("0", "metrics off"), ("1", "metrics on")):
+        print("{:<12} {:>8.1f} us/request".format(name, best[enabled]))
+    print("measured     {:>8.1f} %".format(
+        (best["1"] / best["0"] - 1) * 100))
+    # read when models.metrics is first imported, here
+    os.environ["METRICS_ENABLED"] = "1"
+    cost = timed_call_cost()
+    print("estimated    {:>8.1f} % ({:.0f} metrics/request, "
+          "{:.2f} us each)".format(events * cost / best["0"] * 100,
+                                   events, cost))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--worker"]:
+        worker(int(sys.argv[2]))
+    else:
+        main()
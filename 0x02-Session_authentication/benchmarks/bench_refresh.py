@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+""" Benchmark of the cross-process staleness check of the json
+storage: the cost of a check when nothing changed, and the time a
+reader takes to catch up with one user saved by another storage,
+in the snapshot and journal modes
+Usage: ./bench_refresh.py [users] [checks]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+import models.base  # noqa: E402
+from models.engine import file_storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def check_latency(reader: FileStorage, checks: int) -> float:
+    """ Mean time of a staleness check, in microseconds, when the
+    files did not change
+    """
+    start = time.perf_counter()
+    for _ in range(checks):
+        reader.refresh(User)
+    return (time.perf_counter() - start) / checks * 1e6
+
+
+def catch_up_latency(reader: FileStorage, writes: int) -> float:
+    """ Mean time, in milliseconds, a reader takes to see one user
+    saved by the writer storage
+    """
+    elapsed = 0
+    for i in range(writes):
+        User(email="new{}@example.com".format(i)).save()
+        start = time.perf_counter()
+        reader.refresh(User)
+        elapsed += time.perf_counter() - start
+    return elapsed / writes * 1e3
+
+
+def main():
+    """ Time both modes with users already stored
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    checks = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    print("{} users".format(count))
+    for mode in ("snapshot", "journal"):
+        file_storage.STORAGE_MODE = mode
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            models.base.storage = FileStorage()
+            User.load_from_file()
+            models.base.storage.store(User).load(
+                User(email="user{}@example.com".format(i))
+                for i in range(count))
+            User.save_to_file()
+            reader = FileStorage()
+            reader.load(User)
+            assert reader.count(User) == count
+            print("{:<8} check {:>6.2f} us, catch up {:>8.3f} ms".format(
+                mode, check_latency(reader, checks),
+                catch_up_latency(reader, 20)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+""" Benchmark of Auth.require_auth with 1k excluded paths: the
+compiled PathMatcher against the linear loop it replaced, on exact
+paths only, and with `*` prefix and infix patterns
+Usage: ./bench_require_auth.py [patterns] [lookups]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+from api.v1.auth.auth import Auth  # noqa: E402
+
+
+def require_auth_loop(path, excluded_paths):
+    """ require_auth as it was: every excluded path compared in turn
+    """
+    if path is None:
+        return True
+    if excluded_paths is None or len(excluded_paths) == 0:
+        return True
+    if path[-1] != '/':
+        path += '/'
+    for excluded_path in excluded_paths:
+        if excluded_path[-1] != '/':
+            excluded_path += '/'
+        if path == excluded_path:
+            return False
+    return True
+
+
+def main():
+    """ Time lookups of excluded and non excluded paths
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    exact = ["/api/v1/resource{}/".format(i) for i in range(count)]
+    wildcards = ["/api/v1/stat{}*".format(i) for i in range(count // 2)] + \
+        ["/api/v1/*/item{}".format(i) for i in range(count // 2)]
+    paths = ["/api/v1/resource{}".format(count - 1), "/api/v1/users",
+             "/api/v1/stat7/x", "/api/v1/a/item3"]
+    for name, excluded_paths in (("exact", exact),
+                                 ("wildcards", wildcards)):
+        auth = Auth(excluded_paths)
+        for path in paths:
+            matcher = timeit.timeit(lambda: auth.require_auth(
+                path, excluded_paths), number=lookups) / lookups * 1e6
+            line = "{:<9} {:<26} matcher {:>7.2f} us".format(
+                name, path, matcher)
+            if name == "exact":
+                loop = timeit.timeit(lambda: require_auth_loop(
+                    path, excluded_paths), number=lookups) / lookups * 1e6
+                line += "  loop {:>7.2f} us".format(loop)
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
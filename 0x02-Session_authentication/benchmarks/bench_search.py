@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+""" Benchmark of User.search latency at 10k, 100k and 1M users:
+by email (hash index) and by last_name (full scan)
+Usage: ./bench_search.py [sizes] [searches]
+e.g.   ./bench_search.py 10000,100000,1000000 1000
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+import models.base  # noqa: E402
+from models.engine.memory_storage import MemoryStorage  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def latency(searches: int, attribute: str, values: list) -> float:
+    """ Mean User.search latency in microseconds
+    """
+    start = time.perf_counter()
+    for i in range(searches):
+        User.search({attribute: values[i % len(values)]})
+    return (time.perf_counter() - start) / searches * 1e6
+
+
+def main():
+    """ Fill a memory storage with each size and time both searches
+    """
+    sizes = [int(size) for size in (
+        sys.argv[1] if len(sys.argv) > 1 else "10000,100000,1000000"
+    ).split(',')]
+    searches = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    print("{:>9} {:>16} {:>16}".format(
+        "users", "email us/search", "scan us/search"))
+    for size in sizes:
+        models.base.storage = MemoryStorage()
+        store = models.base.storage.store(User)
+        store.load(User(id=str(i), email="user{}@example.com".format(i),
+                        last_name="Last{}".format(i))
+                   for i in range(size))
+        step = max(1, size // 100)
+        emails = ["user{}@example.com".format(i)
+                  for i in range(0, size, step)]
+        last_names = ["Last{}".format(i) for i in range(0, size, step)]
+        indexed = latency(searches, "email", emails)
+        scanned = latency(max(1, searches * 1000 // size), "last_name",
+                          last_names)
+        print("{:>9} {:>16.2f} {:>16.2f}".format(size, indexed, scanned))
+
+
+if __name__ == "__main__":
+    main()
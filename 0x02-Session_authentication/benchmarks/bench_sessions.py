@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+""" Benchmark of the per-request cost of authentication: time of
+current_user for one request of each auth class, sessions against
+Basic credentials with and without their cache
+Usage: ./bench_sessions.py [requests] [users]
+"""
+import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("SESSION_NAME", "_my_session_id")
+os.environ.setdefault("SESSION_DURATION", "3600")
+from flask import request  # noqa: E402
+from api.v1.app import EXCLUDED_PATHS, app  # noqa: E402
+from api.v1.auth.basic_auth import BasicAuth  # noqa: E402
+from api.v1.auth.session_auth import SessionAuth  # noqa: E402
+from api.v1.auth.session_db_auth import SessionDBAuth  # noqa: E402
+from api.v1.auth.session_exp_auth import SessionExpAuth  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def latency(auth, requests: int, headers: dict) -> float:
+    """ Mean time of current_user for a request, in microseconds
+    """
+    with app.test_request_context("/api/v1/stats", headers=headers):
+        assert auth.current_user(request) is not None
+        start = time.perf_counter()
+        for _ in range(requests):
+            auth.current_user(request)
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    """ Time every auth class on the same user
+    """
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    for i in range(count):
+        user = User(email="user{}@example.com".format(i))
+        user.password = "password{}".format(i)
+        user.save()
+    user = User.search({'email': "user7@example.com"})[0]
+    credentials = base64.b64encode(b"user7@example.com:password7")
+    basic = {"Authorization": "Basic " + credentials.decode()}
+    uncached = BasicAuth(EXCLUDED_PATHS)
+    uncached.credential_cache.ttl = 0
+    print("{:<16} {:>8.2f} us".format(
+        "BasicAuth", latency(uncached, requests, basic)))
+    print("{:<16} {:>8.2f} us".format(
+        "BasicAuth cached", latency(BasicAuth(EXCLUDED_PATHS), requests,
+                                    basic)))
+    for auth_class in (SessionAuth, SessionExpAuth, SessionDBAuth):
+        auth = auth_class(EXCLUDED_PATHS)
+        cookie = {"Cookie": "{}={}".format(os.environ["SESSION_NAME"],
+                                           auth.create_session(user.id))}
+        print("{:<16} {:>8.2f} us".format(
+            auth_class.__name__, latency(auth, requests, cookie)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+""" Benchmark of a worker cold start on a .db_User.json of many
+users: time to load the file and serve a first request (a search
+by email and a to_json), and peak RSS, eager and with STORAGE_LAZY=1
+Usage: ./bench_startup.py [users]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                       os.pardir))
+
+
+def worker():
+    """ Cold start in this process: print seconds and peak RSS (KiB)
+    """
+    start = time.perf_counter()
+    from models.user import User
+    User.load_from_file()
+    user = User.search({'email': "user7@example.com"})[0]
+    user.to_json()
+    elapsed = time.perf_counter() - start
+    print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def write_users(count: int):
+    """ Write a .db_User.json of count users in the current directory
+    """
+    with open(".db_User.json", 'w') as f:
+        f.write("{")
+        for i in range(count):
+            user_id = "{:036d}".format(i)
+            f.write("{}{}: {}".format("," if i > 0 else "", json.dumps(
+                user_id), json.dumps({
+                    "id": user_id, "created_at": "2024-01-01T00:00:00",
+                    "updated_at": "2024-01-02T00:00:00",
+                    "email": "user{}@example.com".format(i),
+                    "_password": "0" * 64, "first_name": "First",
+                    "last_name": "Last{}".format(i)})))
+        f.write("}")
+
+
+def main():
+    """ Time a cold start of both load modes in new processes
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        write_users(count)
+        print("{} users, {:.1f} MB file".format(
+            count, os.path.getsize(".db_User.json") / 1e6))
+        for name, lazy in (("eager", "0"), ("lazy", "1")):
+            env = dict(os.environ, STORAGE_BACKEND="json",
+                       STORAGE_LAZY=lazy, PYTHONPATH=PROJECT)
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker"],
+                env=env, check=True, stdout=subprocess.PIPE,
+                universal_newlines=True).stdout.split()
+            print("{:<6} first request after {:.3f}s, {:.0f} MB RSS".format(
+                name, float(output[0]), int(output[1]) / 1024))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--worker"]:
+        worker()
+    else:
+        main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+""" Benchmark of the timestamp codec over 1M conversions each way,
+against strptime and strftime
+Usage: ./bench_timestamps.py [conversions]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+from models.base import (  # noqa: E402
+    TIMESTAMP_FORMAT, format_timestamp, parse_timestamp)
+
+
+def rate(func, values: list) -> float:
+    """ Conversions per second of func over values
+    """
+    start = time.perf_counter()
+    for value in values:
+        func(value)
+    return len(values) / (time.perf_counter() - start)
+
+
+def main():
+    """ Time parsing and formatting, with mostly distinct values
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    origin = datetime(2020, 1, 1)
+    values = [origin + timedelta(seconds=i * 7) for i in range(count)]
+    texts = [value.strftime(TIMESTAMP_FORMAT) for value in values]
+    for name, func, inputs in (
+            ("strptime", lambda text: datetime.strptime(
+                text, TIMESTAMP_FORMAT), texts),
+            ("parse_timestamp", parse_timestamp, texts),
+            ("strftime", lambda value: value.strftime(TIMESTAMP_FORMAT),
+             values),
+            ("format_timestamp", format_timestamp, values)):
+        print("{:<17} {:>12.0f} conversions/s".format(
+            name, rate(func, inputs)))
+
+
+if __name__ == "__main__":
+    main()
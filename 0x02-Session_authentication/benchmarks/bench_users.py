@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+""" Benchmark of GET /api/v1/users on many users: response time and
+peak memory allocated while serving the whole list, the first page
+and a page in the middle (by cursor), on a memory storage
+Usage: ./bench_users.py [users] [limit]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+import models.base  # noqa: E402
+from api.v1 import app as app_module  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def serve(client, query: dict) -> tuple:
+    """ Time of one request, and the peak memory allocated while
+    serving it again under tracemalloc, the whole response being read
+    """
+    start = time.perf_counter()
+    response = client.get("/api/v1/users", query_string=query)
+    response.get_data()
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200
+    tracemalloc.start()
+    client.get("/api/v1/users", query_string=query).get_data()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    """ Fill a memory storage and time each kind of request
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    store = models.base.storage.store(User)
+    store.load(User(id="{:08d}".format(i),
+                    email="user{}@example.com".format(i))
+               for i in range(count))
+    # the listing alone is timed, without authentication
+    app_module.auth = None
+    client = app_module.app.test_client()
+    # the first page sorts the ids once, later ones reuse them
+    client.get("/api/v1/users", query_string={"limit": limit})
+    requests = (
+        ("whole list", {}),
+        ("first page", {"limit": limit}),
+        ("middle page", {"limit": limit,
+                         "cursor": "{:08d}".format(count // 2)}),
+    )
+    print("{} users, pages of {}".format(count, limit))
+    for name, query in requests:
+        elapsed, peak = serve(client, query)
+        print("{:<12} {:>10.2f} ms {:>10.1f} MB peak".format(
+            name, elapsed * 1e3, peak / 1e6))
+
+
+if __name__ == "__main__":
+    main()
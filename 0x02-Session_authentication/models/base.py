@@ -2,39 +2,107 @@
 """ Base module
 """
 from datetime import datetime
-from typing import TypeVar, List, Iterable
-from os import path
-import json
+from functools import lru_cache
+from typing import TypeVar, List, Iterable, Tuple
 import uuid
 
+from models.engine import get_storage
+from models.metrics import timed
+
 
 TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
-DATA = {}
+_FIELDS = {}
+_MISSING = object()
+
+# where objects live, chosen with STORAGE_BACKEND (see models.engine)
+storage = get_storage()
+
+
+def parse_timestamp(value: str) -> datetime:
+    """ Parse a TIMESTAMP_FORMAT string, with fromisoformat for the
+    usual zero padded form and strptime for anything else
+    """
+    if len(value) == 19 and value[10] == "T" and \
+            value[13] == ":" and value[16] == ":":
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.strptime(value, TIMESTAMP_FORMAT)
+
+
+@lru_cache(maxsize=4096)
+def format_timestamp(value: datetime) -> str:
+    """ Format a datetime as TIMESTAMP_FORMAT
+    """
+    if value.year < 1000:
+        return value.strftime(TIMESTAMP_FORMAT)
+    return "%04d-%02d-%02dT%02d:%02d:%02d" % (
+        value.year, value.month, value.day,
+        value.hour, value.minute, value.second)
+
+
+def flush():
+    """ Write every pending change of the storage now
+    """
+    storage.flush()
+
+
+def wait_for_flush(timeout: float = None) -> bool:
+    """ Wait until every change made so far is written,
+    return False if timeout seconds passed first
+    """
+    return storage.wait_for_flush(timeout)
 
 
 class Base():
     """ Base class
     """
 
+    # attributes are slots, not a per instance __dict__: subclasses
+    # list their own in __slots__ and to_json serializes all of them
+    __slots__ = ('id', 'created_at', 'updated_at')
+
+    # attributes with a hash index used by search
+    indexed_attributes = ()
+
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a Base instance
         """
-        s_class = str(self.__class__.__name__)
-        if DATA.get(s_class) is None:
-            DATA[s_class] = {}
-
-        self.id = kwargs.get('id', str(uuid.uuid4()))
+        if 'id' in kwargs:
+            self.id = kwargs['id']
+        else:
+            self.id = str(uuid.uuid4())
         if kwargs.get('created_at') is not None:
-            self.created_at = datetime.strptime(kwargs.get('created_at'),
-                                                TIMESTAMP_FORMAT)
+            self.created_at = parse_timestamp(kwargs.get('created_at'))
         else:
             self.created_at = datetime.utcnow()
         if kwargs.get('updated_at') is not None:
-            self.updated_at = datetime.strptime(kwargs.get('updated_at'),
-                                                TIMESTAMP_FORMAT)
+            self.updated_at = parse_timestamp(kwargs.get('updated_at'))
         else:
             self.updated_at = datetime.utcnow()
 
+    def __setattr__(self, name: str, value):
+        """ Set an attribute, keeping the indexes of stored objects
+        """
+        if name in self.indexed_attributes:
+            storage.set_attribute(self, name, value)
+        else:
+            super().__setattr__(name, value)
+
+    @classmethod
+    def fields(cls) -> Tuple[str, ...]:
+        """ Slot attributes of the class, base classes first
+        """
+        fields = _FIELDS.get(cls)
+        if fields is None:
+            fields = tuple(
+                name for klass in reversed(cls.__mro__)
+                for name in klass.__dict__.get('__slots__', ())
+                if name not in ('__dict__', '__weakref__'))
+            _FIELDS[cls] = fields
+        return fields
+
     def __eq__(self, other: TypeVar('Base')) -> bool:
         """ Equality
         """
@@ -48,65 +116,48 @@ class Base():
         """ Convert the object a JSON dictionary
         """
         result = {}
-        for key, value in self.__dict__.items():
+        attributes = [(key, getattr(self, key, _MISSING))
+                      for key in self.fields()]
+        attributes.extend(getattr(self, '__dict__', {}).items())
+        for key, value in attributes:
+            if value is _MISSING:
+                continue
             if not for_serialization and key[0] == '_':
                 continue
             if type(value) is datetime:
-                result[key] = value.strftime(TIMESTAMP_FORMAT)
+                result[key] = format_timestamp(value)
             else:
                 result[key] = value
         return result
 
     @classmethod
     def load_from_file(cls):
-        """ Load all objects from file
+        """ Load all objects from the storage
         """
-        s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
-        DATA[s_class] = {}
-        if not path.exists(file_path):
-            return
-
-        with open(file_path, 'r') as f:
-            objs_json = json.load(f)
-            for obj_id, obj_json in objs_json.items():
-                DATA[s_class][obj_id] = cls(**obj_json)
+        storage.load(cls)
 
     @classmethod
     def save_to_file(cls):
-        """ Save all objects to file
+        """ Save all objects to the storage
         """
-        s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
-        objs_json = {}
-        for obj_id, obj in DATA[s_class].items():
-            objs_json[obj_id] = obj.to_json(True)
-
-        with open(file_path, 'w') as f:
-            json.dump(objs_json, f)
+        storage.save_to_file(cls)
 
     def save(self):
         """ Save current object
         """
-        s_class = self.__class__.__name__
         self.updated_at = datetime.utcnow()
-        DATA[s_class][self.id] = self
-        self.__class__.save_to_file()
+        storage.save(self)
 
     def remove(self):
         """ Remove object
         """
-        s_class = self.__class__.__name__
-        if DATA[s_class].get(self.id) is not None:
-            del DATA[s_class][self.id]
-            self.__class__.save_to_file()
+        storage.remove(self)
 
     @classmethod
     def count(cls) -> int:
         """ Count all objects
         """
-        s_class = cls.__name__
-        return len(DATA[s_class].keys())
+        return storage.count(cls)
 
     @classmethod
     def all(cls) -> Iterable[TypeVar('Base')]:
@@ -118,20 +169,22 @@ class Base():
     def get(cls, id: str) -> TypeVar('Base'):
         """ Return one object by ID
         """
-        s_class = cls.__name__
-        return DATA[s_class].get(id)
+        return storage.get(cls, id)
 
     @classmethod
+    @timed("model_operation_seconds", "Time spent in model operations",
+           operation="search")
     def search(cls, attributes: dict = {}) -> List[TypeVar('Base')]:
         """ Search all objects with matching attributes
         """
-        s_class = cls.__name__
-        def _search(obj):
-            if len(attributes) == 0:
-                return True
-            for k, v in attributes.items():
-                if (getattr(obj, k) != v):
-                    return False
-            return True
-        
-        return list(filter(_search, DATA[s_class].values()))
+        return storage.search(cls, attributes)
+
+    @classmethod
+    @timed("model_operation_seconds", "Time spent in model operations",
+           operation="page")
+    def page(cls, after: str = None,
+             limit: int = None) -> List[TypeVar('Base')]:
+        """ Return up to limit objects (all without a limit) by id,
+        starting after the id after
+        """
+        return storage.page(cls, after, limit)
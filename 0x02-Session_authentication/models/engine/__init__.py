@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+""" Storage engines of the models:
+- "json": objects in memory, written to .db_<Class>.json files
+- "memory": objects in memory only
+- "sqlite": objects in the STORAGE_SQLITE_PATH SQLite database
+
+get, search and all return the stored objects themselves with
+"json" and "memory": a change made to one is seen by every caller,
+searches on indexed attributes included, before it is saved. With
+"sqlite" each call builds new objects from the saved rows, so only
+saved changes are seen. Code meant for every backend saves the
+objects it changes and never relies on their identity
+"""
+from os import getenv
+
+from models.engine.db_storage import SQLiteStorage
+from models.engine.file_storage import FileStorage
+from models.engine.memory_storage import MemoryStorage
+
+
+BACKENDS = ("json", "memory", "sqlite")
+
+
+def get_storage(name: str = None):
+    """ Return a new storage engine by name, STORAGE_BACKEND
+    by default
+    """
+    if name is None:
+        name = getenv("STORAGE_BACKEND", "json")
+    if name == "json":
+        return FileStorage()
+    if name == "memory":
+        return MemoryStorage()
+    if name == "sqlite":
+        return SQLiteStorage(getenv("STORAGE_SQLITE_PATH", ".db.sqlite3"))
+    raise ValueError("Unknown storage backend {}, expected one of {}".format(
+        name, ", ".join(BACKENDS)))
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+""" SQLiteStorage module
+"""
+from typing import List, TypeVar
+import json
+import sqlite3
+import threading
+
+from models.metrics import timed
+from models.store import matches
+
+
+# values a search can compare inside SQLite: the other ones are only
+# compared in Python, on the rows selected by the rest of the search
+_PUSHDOWN_TYPES = (str, int, float, bool, type(None))
+
+
+class SQLiteStorage():
+    """ Storage keeping objects in a SQLite database, one table
+    per class holding the JSON of each object. Indexed attributes
+    get an index on their JSON value, used by search
+    """
+
+    def __init__(self, database: str):
+        """ Initialize a SQLiteStorage instance
+        """
+        self.database = database
+        self._local = threading.local()
+        self._tables = set()
+        self._tables_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """ Return the connection of the current thread
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            if self.database == ":memory:":
+                # one in-memory database shared by every thread
+                connection = sqlite3.connect(
+                    "file::memory:?cache=shared", uri=True, timeout=30)
+            else:
+                connection = sqlite3.connect(self.database, timeout=30)
+                connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _table(self, cls: type) -> str:
+        """ Return the quoted table name of a class, creating
+        the table and its indexes on first use
+        """
+        s_class = cls.__name__
+        table = '"{}"'.format(s_class)
+        if s_class in self._tables:
+            return table
+        with self._tables_lock:
+            connection = self._connection()
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS {} "
+                "(id TEXT PRIMARY KEY, data TEXT NOT NULL)".format(table))
+            for attr in cls.indexed_attributes:
+                connection.execute(
+                    'CREATE INDEX IF NOT EXISTS "{0}_{1}" '
+                    "ON {2} (json_extract(data, '$.{1}'))".format(
+                        s_class, attr, table))
+            connection.commit()
+            self._tables.add(s_class)
+        return table
+
+    def load(self, cls: type):
+        """ Load all objects of a class: they are read on demand
+        """
+        self._table(cls)
+
+    def save_to_file(self, cls: type):
+        """ Write all objects of a class: every change is committed
+        """
+
+    @timed("model_operation_seconds", "Time spent in model operations",
+           operation="save")
+    def save(self, obj: TypeVar('Base')):
+        """ Add or replace an object
+        """
+        table = self._table(obj.__class__)
+        connection = self._connection()
+        # an update keeps the rowid, so objects keep their order
+        connection.execute(
+            "INSERT INTO {} (id, data) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data".format(
+                table), (obj.id, json.dumps(obj.to_json(True))))
+        connection.commit()
+
+    def remove(self, obj: TypeVar('Base')) -> bool:
+        """ Remove an object, return False if it was not stored
+        """
+        table = self._table(obj.__class__)
+        connection = self._connection()
+        cursor = connection.execute(
+            "DELETE FROM {} WHERE id = ?".format(table), (obj.id,))
+        connection.commit()
+        return cursor.rowcount > 0
+
+    def count(self, cls: type) -> int:
+        """ Count all objects of a class
+        """
+        table = self._table(cls)
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM {}".format(table)).fetchone()
+        return row[0]
+
+    def get(self, cls: type, obj_id: str) -> TypeVar('Base'):
+        """ Return one object by id, or None
+        """
+        table = self._table(cls)
+        row = self._connection().execute(
+            "SELECT data FROM {} WHERE id = ?".format(table),
+            (obj_id,)).fetchone()
+        if row is None:
+            return None
+        return cls(**json.loads(row[0]))
+
+    def search(self, cls: type, attributes: dict) -> List[TypeVar('Base')]:
+        """ Return all objects of a class with matching attributes:
+        attributes of the class with simple values are compared in
+        SQLite, then every attribute is checked on the objects built
+        """
+        table = self._table(cls)
+        fields = cls.fields()
+        clauses, params = [], []
+        for k, v in attributes.items():
+            if k not in fields or type(v) not in _PUSHDOWN_TYPES:
+                continue
+            if k == 'id':
+                column = "id"
+            else:
+                column = "json_extract(data, '$.{}')".format(k)
+            if v is None:
+                clauses.append("{} IS NULL".format(column))
+            else:
+                clauses.append("{} = ?".format(column))
+                params.append(v)
+        query = "SELECT data FROM {}".format(table)
+        if len(clauses) > 0:
+            query += " WHERE " + " AND ".join(clauses)
+        rows = self._connection().execute(
+            query + " ORDER BY rowid", params)
+        objs = (cls(**json.loads(data)) for data, in rows)
+        return [obj for obj in objs if matches(obj, attributes)]
+
+    def page(self, cls: type, after: str,
+             limit: int) -> List[TypeVar('Base')]:
+        """ Return up to limit objects of a class in id order,
+        starting after the id after: a range of the primary key
+        """
+        table = self._table(cls)
+        query, params = "SELECT data FROM {}".format(table), []
+        if after is not None:
+            query += " WHERE id > ?"
+            params.append(after)
+        query += " ORDER BY id LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        rows = self._connection().execute(query, params)
+        return [cls(**json.loads(data)) for data, in rows]
+
+    def set_attribute(self, obj: TypeVar('Base'), name: str, value):
+        """ Set an indexed attribute of an object: the index is
+        updated when the object is saved
+        """
+        object.__setattr__(obj, name, value)
+
+    def flush(self):
+        """ Write every pending change: every change is committed
+        """
+
+    def wait_for_flush(self, timeout: float = None) -> bool:
+        """ Wait until every change is written: always done
+        """
+        return True
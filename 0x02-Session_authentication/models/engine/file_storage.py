@@ -0,0 +1,689 @@
+#!/usr/bin/env python3
+""" FileStorage module
+"""
+from contextlib import contextmanager
+from os import getenv, path
+from typing import Callable, Iterable, Iterator, List, Tuple, TypeVar
+import atexit
+import codecs
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+from models.engine.memory_storage import MemoryStorage
+from models.metrics import timed
+from models.store import RawEntry, Store
+
+
+# "snapshot" rewrites .db_<Class>.json on each change, "journal"
+# appends each change to .db_<Class>.journal and compacts it into
+# the snapshot once it outgrows the number of objects. Both fsync
+# every write, so a change is durable once it is written.
+STORAGE_MODE = getenv("STORAGE_MODE", "snapshot")
+JOURNAL_MIN_ENTRIES = 1000
+
+# snapshots are written to a temporary file, fsynced and renamed over
+# .db_<Class>.json; the previous one is kept as .db_<Class>.json.bak to
+# recover from a torn or corrupted file, with a warning. With
+# STORAGE_CHECKSUM=1 each snapshot also embeds a sha256 of its content,
+# checked on load. The backup is one write behind: in the journal mode
+# the journal was emptied when the newer snapshot was compacted, so the
+# changes folded into it are lost. A bad snapshot without a valid backup
+# is an error, raised by the first load of its class.
+# Snapshots are parsed one object at a time, never read whole.
+STORAGE_CHECKSUM = getenv("STORAGE_CHECKSUM", "0") == "1"
+CHECKSUM_KEY = "__checksum__"
+
+# group commit: with a STORAGE_FLUSH_INTERVAL (seconds) above 0, changes
+# land in memory at once and a background thread writes them to disk
+# every interval, or sooner once STORAGE_FLUSH_DIRTY objects are waiting.
+# Saves do not wait for a write in progress: it holds the files, not
+# the objects in memory.
+# Changes younger than the interval are lost if the process crashes;
+# flush() and wait_for_flush() give callers durability on demand.
+# When a write fails (disk full, permissions...), the changes stay
+# pending in memory: the error is logged and the write retried every
+# interval, wait_for_flush() keeps waiting, and they are lost only if
+# the process exits before a write succeeds.
+FLUSH_INTERVAL = float(getenv("STORAGE_FLUSH_INTERVAL", "0"))
+FLUSH_MAX_DIRTY = int(getenv("STORAGE_FLUSH_DIRTY", "100"))
+
+# with STORAGE_LAZY=1, load keeps where the JSON of each object is in
+# the snapshot, with the values of its indexed attributes, and only
+# builds it (parsing its timestamps) the first time it is used. The
+# snapshot stays open meanwhile, so that its JSON can be read back
+# after the file was replaced: files must not be edited in place.
+STORAGE_LAZY = getenv("STORAGE_LAZY", "0") == "1"
+READ_CHUNK_SIZE = 1 << 16
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+# other processes (workers of the same app) may change the files: reads
+# check them (two stat calls) at most every STORAGE_REFRESH_INTERVAL
+# seconds, 0 meaning on every read and a negative value never. A
+# rewritten snapshot is reloaded, new journal entries are read alone.
+# In the snapshot mode every write of one process rewrites the snapshot
+# and makes the others reload the whole file: several processes should
+# share the files in the journal mode (STORAGE_MODE=journal), where they
+# only reload after a compaction.
+REFRESH_INTERVAL = float(getenv("STORAGE_REFRESH_INTERVAL", "0"))
+
+logger = logging.getLogger(__name__)
+T = TypeVar('T')
+
+# mode of new files, as open() would create them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_NEW_FILE_MODE = 0o666 & ~_UMASK
+
+
+def _checksum_update(digest, obj_id: str, obj_json: dict):
+    """ Add one object of a snapshot to its checksum
+    """
+    digest.update(json.dumps([obj_id, obj_json], sort_keys=True).encode())
+
+
+def _iter_json_object(f) -> Iterator[Tuple[str, object]]:
+    """ Yield the (key, value) pairs of the JSON object in a file
+    one at a time, reading it in chunks instead of all at once.
+    Raise ValueError on a torn or invalid document
+    """
+    for key, item, _, _ in _iter_json_members(f):
+        yield key, item
+
+
+def _iter_json_members(f) -> Iterator[Tuple[str, object, int, int]]:
+    """ Yield the (key, value, start, end) members of the JSON object
+    in a file as _iter_json_object does, start and end being the
+    offsets of the value in the file: in bytes for a binary file,
+    read as UTF-8, in characters for a text file
+    """
+    decode = json.JSONDecoder().raw_decode
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf, pos, eof = "", 0, False
+    # buf[mark] is at mark_offset in the file; by_char tells if the
+    # offsets in buf are counted in characters (text file or ASCII)
+    mark, mark_offset, by_char, binary = 0, 0, True, False
+    state, key = "start", None
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if state == "end" and pos == len(buf) and eof:
+            return
+        try:
+            if pos == len(buf):
+                raise ValueError("Need more data")
+            if state in ("key", "value"):
+                item, end = decode(buf, pos)
+                if not eof and _NUMBER_TAIL.match(buf, end).end() == \
+                        len(buf):
+                    # the value may go on in the next chunk, such as
+                    # 1 of 1.5 or 1e of 1e5
+                    raise ValueError("Need more data")
+        except ValueError:
+            if eof:
+                raise ValueError("Torn or invalid JSON document")
+            if by_char:
+                mark_offset += pos - mark
+            else:
+                mark_offset += len(buf[mark:pos].encode())
+            chunk = f.read(READ_CHUNK_SIZE)
+            eof = len(chunk) == 0
+            if type(chunk) is bytes:
+                chunk, binary = utf8.decode(chunk, eof), True
+            buf, pos, mark = buf[pos:] + chunk, 0, 0
+            by_char = not binary or buf.isascii()
+            continue
+
+        if state == "key" and type(item) is str:
+            key, pos, state = item, end, "colon"
+        elif state == "value":
+            if by_char:
+                start = mark_offset + pos - mark
+                yield key, item, start, start + end - pos
+            else:
+                mark_offset += len(buf[mark:pos].encode())
+                mark = end
+                start, mark_offset = mark_offset, mark_offset + len(
+                    buf[pos:end].encode())
+                yield key, item, start, mark_offset
+            pos, state = end, "comma"
+        elif state == "start" and buf[pos] == "{":
+            pos, state = pos + 1, "first"
+        elif state == "first" and buf[pos] != "}":
+            state = "key"
+        elif state == "colon" and buf[pos] == ":":
+            pos, state = pos + 1, "value"
+        elif state == "comma" and buf[pos] == ",":
+            pos, state = pos + 1, "key"
+        elif state in ("first", "comma") and buf[pos] == "}":
+            # only whitespace may follow the object
+            pos, state = pos + 1, "end"
+        else:
+            raise ValueError("Invalid JSON document")
+
+
+class SnapshotFile():
+    """ A snapshot file kept open while objects read from it are not
+    built: their JSON stays readable after the file is replaced
+    """
+
+    fd = None
+
+    def __init__(self, file_path: str):
+        """ Open a snapshot file
+        """
+        self.path = file_path
+        self.fd = os.open(file_path, os.O_RDONLY)
+
+    def read(self, offset: int, length: int) -> str:
+        """ Return the text of length bytes at offset
+        """
+        return os.pread(self.fd, length, offset).decode()
+
+    def __del__(self):
+        """ Close the file once nothing is read from it anymore
+        """
+        if self.fd is not None:
+            os.close(self.fd)
+
+
+def _iter_snapshot(snapshot: SnapshotFile) -> Iterator[Tuple[dict, int,
+                                                             int]]:
+    """ Yield the (JSON, start, end) of the objects of a snapshot file,
+    start and end being the offsets of their JSON in bytes, checking
+    its checksum if it has one
+    """
+    digest = hashlib.sha256()
+    with os.fdopen(snapshot.fd, 'rb', closefd=False) as f:
+        for obj_id, obj_json, start, end in _iter_json_members(f):
+            if obj_id == CHECKSUM_KEY:
+                if STORAGE_CHECKSUM and obj_json != digest.hexdigest():
+                    raise ValueError("Checksum mismatch in {}".format(
+                        snapshot.path))
+                continue
+            if STORAGE_CHECKSUM:
+                _checksum_update(digest, obj_id, obj_json)
+            yield obj_json, start, end
+
+
+def _write_atomic(file_path: str, content: str):
+    """ Replace a file with content in one step: readers see
+    either the old or the new file, never a partial one.
+    The replaced file is kept as file_path.bak, and its mode
+    is kept by the new file
+    """
+    directory = path.dirname(path.abspath(file_path))
+    try:
+        mode = os.stat(file_path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = _NEW_FILE_MODE
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=path.basename(file_path) + ".", dir=directory)
+    try:
+        # mkstemp creates the file readable by its owner only
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        backup_path = file_path + ".bak"
+        if path.exists(file_path):
+            if path.exists(backup_path):
+                os.remove(backup_path)
+            os.link(file_path, backup_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _signature(file_path: str) -> tuple:
+    """ Identity of a file version: inode, modification time and
+    size, or None if the file does not exist
+    """
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _size(file_path: str) -> int:
+    """ Size of a file, 0 if it does not exist
+    """
+    try:
+        return os.stat(file_path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _read_snapshot(file_path: str, load: Callable[..., T]) -> T:
+    """ Read a snapshot file with load, which gets the open file and
+    an iterator of the (JSON, start, end) of its objects, and return
+    its result. load starts over on the backup when the file turns
+    out to be torn or fails its checksum
+    """
+    if not path.exists(file_path):
+        return load(None, iter(()))
+    for snapshot_path in (file_path, file_path + ".bak"):
+        try:
+            snapshot = SnapshotFile(snapshot_path)
+        except FileNotFoundError:
+            continue
+        try:
+            result = load(snapshot, _iter_snapshot(snapshot))
+        except ValueError as e:
+            logger.warning("%s: %s", snapshot_path, e)
+            continue
+        if snapshot_path != file_path:
+            logger.warning("%s is torn or corrupted, loaded its backup "
+                           "%s: the changes of its last write are lost",
+                           file_path, snapshot_path)
+        return result
+    raise ValueError("{} is corrupted and has no valid backup".format(
+        file_path))
+
+
+class FileStorage(MemoryStorage):
+    """ Storage keeping objects in memory and writing them
+    to .db_<Class>.json files (and .db_<Class>.journal files
+    in the journal mode).
+    Several processes may share the files: writes hold an exclusive
+    lock on .db_<Class>.lock and first catch up with the files, and
+    reads catch up when the files changed since they were last read.
+    Threads hold _io_lock to use the files and _write_lock to change
+    the objects in memory, in that order
+    """
+
+    def __init__(self):
+        """ Initialize a FileStorage instance
+        """
+        super().__init__()
+        self.journal_sizes = {}
+        self.dirty = {}
+        # per class name: (snapshot signature, journal bytes read)
+        self.signatures = {}
+        self._checked = {}
+        self._lock_files = {}
+        self._lock_depths = {}
+        self._flush_cond = threading.Condition()
+        self._io_lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        self._flusher = None
+        self._generation = 0
+        self._durable_generation = 0
+        self._warned = False
+        atexit.register(self.flush)
+
+    @contextmanager
+    def _locked(self, cls: type, exclusive: bool) -> Iterator[None]:
+        """ Hold the files of a class in a with block: the I/O lock
+        of this process, then the lock file shared with other processes
+        """
+        s_class = cls.__name__
+        with self._io_lock:
+            depth = self._lock_depths.get(s_class, 0)
+            if depth > 0:
+                # already held by this thread, exclusively when it writes
+                self._lock_depths[s_class] = depth + 1
+                try:
+                    yield
+                finally:
+                    self._lock_depths[s_class] = depth
+                return
+            lock_file = self._lock_files.get(s_class)
+            if lock_file is None:
+                lock_file = open(".db_{}.lock".format(s_class), 'a')
+                self._lock_files[s_class] = lock_file
+            fcntl.flock(lock_file,
+                        fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depths[s_class] = 1
+            try:
+                yield
+            finally:
+                self._lock_depths[s_class] = 0
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _current_signature(self, cls: type) -> tuple:
+        """ Signature of the files of a class as they are on disk
+        """
+        s_class = cls.__name__
+        return (_signature(".db_{}.json".format(s_class)),
+                _size(".db_{}.journal".format(s_class)))
+
+    def refresh(self, cls: type):
+        """ Catch up with changes other processes made to the files
+        of a class, checking at most every REFRESH_INTERVAL seconds
+        """
+        if REFRESH_INTERVAL < 0:
+            return
+        s_class = cls.__name__
+        if REFRESH_INTERVAL > 0:
+            now = time.monotonic()
+            if now - self._checked.get(s_class, -REFRESH_INTERVAL) < \
+                    REFRESH_INTERVAL:
+                return
+            self._checked[s_class] = now
+        if self.signatures.get(s_class) == self._current_signature(cls):
+            return
+        with self._locked(cls, False):
+            self._refresh(cls)
+
+    def _refresh(self, cls: type, keep_ids: Iterable[str] = ()):
+        """ Catch up with the files of a class, the locks being held:
+        reload the snapshot if it was rewritten, else read the new
+        journal entries. Objects of keep_ids and objects waiting for
+        the group commit keep their state in memory
+        """
+        with self._write_lock:
+            self._refresh_objects(cls, keep_ids)
+
+    def _refresh_objects(self, cls: type, keep_ids: Iterable[str]):
+        """ Catch up with the files of a class, all locks being held
+        """
+        s_class = cls.__name__
+        known = self.signatures.get(s_class)
+        snapshot, journal_size = self._current_signature(cls)
+        if known == (snapshot, journal_size):
+            return
+        store = self.store(cls)
+        kept = {obj_id: store.get(obj_id) for obj_id in
+                set(keep_ids).union(self.dirty.get(cls, ()))}
+        if known is None or known[0] != snapshot or \
+                journal_size < known[1]:
+            if known is not None and STORAGE_MODE != "journal" and \
+                    not self._warned:
+                self._warned = True
+                logger.warning("%s was rewritten by another process and "
+                               "is reloaded whole: processes sharing it "
+                               "should use STORAGE_MODE=journal",
+                               ".db_{}.json".format(s_class))
+            self._load(cls)
+            store = self.store(cls)
+        else:
+            self.replay_journal(cls, store, known[1])
+        for obj_id, obj in kept.items():
+            if obj is None:
+                store.discard(obj_id)
+            else:
+                store.put(obj)
+
+    def load(self, cls: type):
+        """ Load all objects of a class from file, then replay
+        the journal
+        """
+        with self._locked(cls, False):
+            self._load(cls)
+
+    def _load(self, cls: type):
+        """ Load all objects of a class, the locks being held
+        """
+        s_class = cls.__name__
+        file_path = ".db_{}.json".format(s_class)
+
+        def load(snapshot: SnapshotFile, objs: Iterator) -> Store:
+            store = Store(cls.indexed_attributes, cls)
+            if STORAGE_LAZY:
+                store.load(store.raw(obj_json, snapshot, start, end)
+                           for obj_json, start, end in objs)
+            else:
+                store.load(cls(**obj_json) for obj_json, _, _ in objs)
+            return store
+
+        with self._write_lock:
+            snapshot = _signature(file_path)
+            store = _read_snapshot(file_path, load)
+            self.journal_sizes[s_class] = 0
+            self.signatures[s_class] = (snapshot, 0)
+            self.replay_journal(cls, store, 0)
+            self.data[s_class] = store
+
+    def save_to_file(self, cls: type):
+        """ Save all objects of a class to file
+        """
+        with self._locked(cls, True):
+            self._refresh(cls)
+            self._save_to_file(cls)
+
+    @timed("model_operation_seconds", "Time spent in model operations",
+           operation="save_to_file")
+    def _save_to_file(self, cls: type):
+        """ Save all objects of a class to file, the file locks being
+        held: objects changed meanwhile are saved by their next write
+        """
+        s_class = cls.__name__
+        file_path = ".db_{}.json".format(s_class)
+        digest = hashlib.sha256()
+        members = []
+        for obj in self.store(cls).entries():
+            if type(obj) is RawEntry:
+                # written back as it was read
+                text = obj.text()
+                if STORAGE_CHECKSUM:
+                    _checksum_update(digest, obj.id, json.loads(text))
+            else:
+                obj_json = obj.to_json(True)
+                text = json.dumps(obj_json)
+                if STORAGE_CHECKSUM:
+                    _checksum_update(digest, obj.id, obj_json)
+            members.append("{}: {}".format(json.dumps(obj.id), text))
+        if STORAGE_CHECKSUM:
+            members.append("{}: {}".format(json.dumps(CHECKSUM_KEY),
+                                           json.dumps(digest.hexdigest())))
+
+        _write_atomic(file_path, "{" + ", ".join(members) + "}")
+        journal_read = self.signatures.get(s_class, (None, 0))[1]
+        self.signatures[s_class] = (_signature(file_path), journal_read)
+
+    def replay_journal(self, cls: type, store: Store, offset: int = 0):
+        """ Apply the journal entries found after offset (in bytes)
+        on top of the loaded objects
+        """
+        s_class = cls.__name__
+        journal_path = ".db_{}.journal".format(s_class)
+        if not path.exists(journal_path):
+            return
+
+        with open(journal_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("Incomplete line")
+                    entry = json.loads(line)
+                except ValueError:
+                    # torn last line of an interrupted append
+                    break
+                if entry.get('obj') is not None:
+                    store.put(cls(**entry['obj']))
+                else:
+                    store.discard(entry['id'])
+                offset += len(line)
+                self.journal_sizes[s_class] = \
+                    self.journal_sizes.get(s_class, 0) + 1
+        self.signatures[s_class] = (self.signatures[s_class][0], offset)
+
+    def append_to_journal(self, cls: type, obj_ids: List[str]):
+        """ Append the current state of objects to the journal:
+        the object itself, or its removal if it is not stored.
+        The file locks are held
+        """
+        s_class = cls.__name__
+        journal_path = ".db_{}.journal".format(s_class)
+        store = self.store(cls)
+        lines = []
+        for obj_id in obj_ids:
+            entry = {'id': obj_id}
+            obj = store.get(obj_id)
+            if obj is not None:
+                entry['obj'] = obj.to_json(True)
+            lines.append(json.dumps(entry) + "\n")
+
+        snapshot, journal_read = self.signatures[s_class]
+        with open(journal_path, 'ab') as f:
+            # drop the torn line of an interrupted append, if any
+            f.truncate(journal_read)
+            f.write("".join(lines).encode())
+            f.flush()
+            os.fsync(f.fileno())
+            journal_read = f.tell()
+        self.signatures[s_class] = (snapshot, journal_read)
+        self.journal_sizes[s_class] = \
+            self.journal_sizes.get(s_class, 0) + len(lines)
+        if self.journal_sizes[s_class] > max(JOURNAL_MIN_ENTRIES,
+                                             len(store)):
+            self.compact(cls)
+
+    def compact(self, cls: type):
+        """ Fold the journal of a class into its snapshot file
+        """
+        s_class = cls.__name__
+        journal_path = ".db_{}.journal".format(s_class)
+        with self._locked(cls, True):
+            self._refresh(cls)
+            self._save_to_file(cls)
+            open(journal_path, 'w').close()
+            self.journal_sizes[s_class] = 0
+            self.signatures[s_class] = (self.signatures[s_class][0], 0)
+
+    @timed("model_operation_seconds", "Time spent in model operations",
+           operation="write_changes")
+    def write_changes(self, cls: type, obj_ids: List[str]):
+        """ Write changed objects to disk following STORAGE_MODE,
+        after catching up with the changes of other processes
+        """
+        with self._locked(cls, True):
+            self._refresh(cls, obj_ids)
+            if STORAGE_MODE == "journal":
+                self.append_to_journal(cls, obj_ids)
+            elif self.journal_sizes.get(cls.__name__, 0) > 0:
+                self.compact(cls)
+            else:
+                self._save_to_file(cls)
+
+    def persist(self, cls: type, obj_id: str):
+        """ Mark a changed object as waiting to be written: by the
+        caller's flush, or by the group commit when FLUSH_INTERVAL
+        is set
+        """
+        with self._flush_cond:
+            self.dirty.setdefault(cls, {})[obj_id] = None
+            self._generation += 1
+            if FLUSH_INTERVAL <= 0:
+                return
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop,
+                                                 daemon=True)
+                self._flusher.start()
+            self._flush_cond.notify_all()
+
+    def save(self, obj: TypeVar('Base')):
+        """ Add or replace an object and write it
+        """
+        with self._write_lock:
+            super().save(obj)
+            self.persist(obj.__class__, obj.id)
+        if FLUSH_INTERVAL <= 0:
+            self.flush()
+
+    def remove(self, obj: TypeVar('Base')) -> bool:
+        """ Remove an object and write its removal
+        """
+        with self._write_lock:
+            if not super().remove(obj):
+                return False
+            self.persist(obj.__class__, obj.id)
+        if FLUSH_INTERVAL <= 0:
+            self.flush()
+        return True
+
+    def count(self, cls: type) -> int:
+        """ Count all objects of a class
+        """
+        self.refresh(cls)
+        return super().count(cls)
+
+    def get(self, cls: type, obj_id: str) -> TypeVar('Base'):
+        """ Return one object by id, or None
+        """
+        self.refresh(cls)
+        return super().get(cls, obj_id)
+
+    def search(self, cls: type, attributes: dict) -> List[TypeVar('Base')]:
+        """ Return all objects of a class with matching attributes
+        """
+        self.refresh(cls)
+        return super().search(cls, attributes)
+
+    def page(self, cls: type, after: str,
+             limit: int) -> List[TypeVar('Base')]:
+        """ Return up to limit objects of a class in id order,
+        starting after the id after
+        """
+        self.refresh(cls)
+        return super().page(cls, after, limit)
+
+    def _dirty_count(self) -> int:
+        """ Number of changed objects waiting to be written
+        """
+        return sum(len(ids) for ids in self.dirty.values())
+
+    def _flush_loop(self):
+        """ Background writer of the group commit mode: a failed
+        write is logged and retried after FLUSH_INTERVAL
+        """
+        while True:
+            with self._flush_cond:
+                self._flush_cond.wait_for(lambda: len(self.dirty) > 0)
+                self._flush_cond.wait_for(
+                    lambda: self._dirty_count() >= FLUSH_MAX_DIRTY,
+                    FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Group commit failed, retrying in %ss",
+                                 FLUSH_INTERVAL)
+                time.sleep(FLUSH_INTERVAL)
+
+    def flush(self):
+        """ Write every pending change to disk now. If a write fails,
+        the changes not written stay pending and the error is raised
+        """
+        with self._io_lock:
+            with self._flush_cond:
+                target = self._generation
+                pending = list(self.dirty.items())
+                self.dirty.clear()
+            for i, (cls, ids) in enumerate(pending):
+                try:
+                    self.write_changes(cls, list(ids))
+                except BaseException:
+                    with self._flush_cond:
+                        for cls, ids in pending[i:]:
+                            self.dirty.setdefault(cls, {}).update(ids)
+                    raise
+            with self._flush_cond:
+                self._durable_generation = max(self._durable_generation,
+                                               target)
+                self._flush_cond.notify_all()
+
+    def wait_for_flush(self, timeout: float = None) -> bool:
+        """ Wait until every change made so far is on disk,
+        return False if timeout seconds passed first
+        """
+        with self._flush_cond:
+            target = self._generation
+            return self._flush_cond.wait_for(
+                lambda: self._durable_generation >= target, timeout)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+""" MemoryStorage module
+"""
+from typing import List, TypeVar
+
+from models.store import Store, matches
+
+
+class MemoryStorage():
+    """ Storage keeping objects in memory only, one Store per class
+    """
+
+    def __init__(self):
+        """ Initialize a MemoryStorage instance
+        """
+        self.data = {}
+
+    def store(self, cls: type) -> Store:
+        """ Return the Store of a class, created on first use
+        """
+        store = self.data.get(cls.__name__)
+        if store is None:
+            store = self.data.setdefault(
+                cls.__name__, Store(cls.indexed_attributes, cls))
+        return store
+
+    def load(self, cls: type):
+        """ Load all objects of a class: nothing to read in memory
+        """
+        self.store(cls)
+
+    def save_to_file(self, cls: type):
+        """ Write all objects of a class: nothing to write in memory
+        """
+
+    def save(self, obj: TypeVar('Base')):
+        """ Add or replace an object
+        """
+        self.store(obj.__class__).put(obj)
+
+    def remove(self, obj: TypeVar('Base')) -> bool:
+        """ Remove an object, return False if it was not stored
+        """
+        return self.store(obj.__class__).discard(obj.id) is not None
+
+    def count(self, cls: type) -> int:
+        """ Count all objects of a class
+        """
+        return len(self.store(cls))
+
+    def get(self, cls: type, obj_id: str) -> TypeVar('Base'):
+        """ Return one object by id, or None
+        """
+        return self.store(cls).get(obj_id)
+
+    def search(self, cls: type, attributes: dict) -> List[TypeVar('Base')]:
+        """ Return all objects of a class with matching attributes
+        """
+        objs = self.store(cls).candidates(attributes)
+        return [obj for obj in objs if matches(obj, attributes)]
+
+    def page(self, cls: type, after: str,
+             limit: int) -> List[TypeVar('Base')]:
+        """ Return up to limit objects of a class in id order,
+        starting after the id after
+        """
+        store = self.store(cls)
+        objs = map(store.get, store.ids_after(after, limit))
+        return [obj for obj in objs if obj is not None]
+
+    def set_attribute(self, obj: TypeVar('Base'), name: str, value):
+        """ Set an indexed attribute of an object
+        """
+        self.store(obj.__class__).set_attribute(obj, name, value)
+
+    def flush(self):
+        """ Write every pending change: none in memory
+        """
+
+    def wait_for_flush(self, timeout: float = None) -> bool:
+        """ Wait until every change is written: always done in memory
+        """
+        return True
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+""" Metrics module: latency histograms and counters of the models
+and the API
+"""
+from bisect import bisect_left
+from functools import wraps
+from os import getenv
+from time import perf_counter
+from typing import Callable, Tuple
+import threading
+
+
+# METRICS_ENABLED=0 turns every histogram off: nothing is recorded,
+# timed functions are left unwrapped and /api/v1/metrics is not found
+ENABLED = getenv("METRICS_ENABLED", "1") == "1"
+
+# upper bounds, in seconds, of the histogram buckets
+BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+           0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5)
+# every histogram and counter by (name, sorted label pairs)
+REGISTRY = {}
+_registry_lock = threading.Lock()
+
+
+class Histogram():
+    """ Distribution of observed values: their count, their sum
+    and the number of them in each bucket
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: dict = None,
+                 buckets: Tuple[float, ...] = BUCKETS):
+        """ Initialize a Histogram instance
+        """
+        self.name = name
+        self.help = help_text
+        self.labels = dict(labels or {})
+        self.buckets = tuple(buckets)
+        # the last count is for values above every bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """ Record one value
+        """
+        if not ENABLED:
+            return
+        i = bisect_left(self.buckets, value)
+        # acquire/release: cheaper than a with block on this hot path
+        lock = self._lock
+        lock.acquire()
+        self.counts[i] += 1
+        self.sum += value
+        lock.release()
+
+    @property
+    def count(self) -> int:
+        """ Number of values recorded
+        """
+        return sum(self.counts)
+
+
+class Counter():
+    """ Number of events, only ever increased
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: dict = None):
+        """ Initialize a Counter instance
+        """
+        self.name = name
+        self.help = help_text
+        self.labels = dict(labels or {})
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        """ Count amount more events
+        """
+        if not ENABLED:
+            return
+        lock = self._lock
+        lock.acquire()
+        self.value += amount
+        lock.release()
+
+
+def _metric(cls: type, name: str, help_text: str, labels: dict):
+    """ Return the metric of a name and labels, created on first use
+    """
+    key = (name, tuple(sorted(labels.items())))
+    metric = REGISTRY.get(key)
+    if metric is None:
+        with _registry_lock:
+            metric = REGISTRY.setdefault(key, cls(name, help_text, labels))
+    if type(metric) is not cls:
+        raise ValueError("{} is a {}, not a {}".format(
+            name, metric.type, cls.type))
+    return metric
+
+
+def histogram(name: str, help_text: str, **labels: str) -> Histogram:
+    """ Return the histogram of a name and labels, created on first use
+    """
+    return _metric(Histogram, name, help_text, labels)
+
+
+def counter(name: str, help_text: str, **labels: str) -> Counter:
+    """ Return the counter of a name and labels, created on first use
+    """
+    return _metric(Counter, name, help_text, labels)
+
+
+def timed(name: str, help_text: str, **labels: str) -> Callable:
+    """ Decorator recording the duration of every call of a function
+    in a histogram
+    """
+    def decorator(func: Callable) -> Callable:
+        """ Wrap func, unless metrics are off
+        """
+        if not ENABLED:
+            return func
+        hist = histogram(name, help_text, **labels)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            """ Call func and record its duration
+            """
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                hist.observe(perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _labels(labels: dict) -> str:
+    """ Prometheus text of label pairs
+    """
+    return ",".join('{}="{}"'.format(
+        key, str(value).replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')) for key, value in labels.items())
+
+
+def render() -> str:
+    """ All histograms and counters in the Prometheus text format
+    """
+    lines = []
+    by_name = {}
+    with _registry_lock:
+        entries = sorted(REGISTRY.items(), key=lambda item: item[0])
+    for key, metric in entries:
+        by_name.setdefault(key[0], []).append(metric)
+    for name, metrics in by_name.items():
+        lines.append("# HELP {} {}".format(name, metrics[0].help))
+        lines.append("# TYPE {} {}".format(name, metrics[0].type))
+        for metric in metrics:
+            labels = _labels(metric.labels)
+            if labels != "":
+                labels = "{" + labels + "}"
+            if metric.type == "counter":
+                lines.append("{}{} {}".format(name, labels, metric.value))
+                continue
+            with metric._lock:
+                counts, total = list(metric.counts), metric.sum
+            cumulative = 0
+            bounds = [repr(bound) for bound in metric.buckets] + ["+Inf"]
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append("{}_bucket{{{}}} {}".format(name, _labels(
+                    dict(metric.labels, le=bound)), cumulative))
+            lines.append("{}_sum{} {}".format(name, labels, repr(total)))
+            lines.append("{}_count{} {}".format(name, labels, cumulative))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+""" Store module
+"""
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Tuple, TypeVar
+import json
+import threading
+
+
+class RawEntry():
+    """ An object not built yet: where its JSON is in a source (with
+    a read(offset, length) method such as a snapshot file), with its
+    id and the values of the indexed attributes of its store
+    """
+
+    __slots__ = ('id', 'source', 'offset', 'length', 'values')
+
+    def __init__(self, obj_id: str, source, offset: int, length: int,
+                 values: tuple):
+        """ Initialize a RawEntry instance
+        """
+        self.id = obj_id
+        self.source = source
+        self.offset = offset
+        self.length = length
+        self.values = values
+
+    def text(self) -> str:
+        """ The JSON text of the object
+        """
+        return self.source.read(self.offset, self.length)
+
+
+def matches(obj, attributes: dict) -> bool:
+    """ Tell if an object has all the attribute values of a search
+    """
+    for k, v in attributes.items():
+        if (getattr(obj, k) != v):
+            return False
+    return True
+
+
+def _index_add(index: dict, value, obj_id: str):
+    """ Add an object id under value in an attribute index
+    """
+    try:
+        index.setdefault(value, {})[obj_id] = None
+    except TypeError:
+        # unhashable values are only found by a full scan
+        pass
+
+
+def _index_discard(index: dict, value, obj_id: str):
+    """ Remove an object id from value in an attribute index
+    """
+    try:
+        ids = index.get(value)
+    except TypeError:
+        return
+    if ids is not None:
+        ids.pop(obj_id, None)
+        if len(ids) == 0:
+            del index[value]
+
+
+class RWLock():
+    """ Reader/writer lock: many readers or one writer.
+    Waiting writers go before new readers, and a thread may take
+    the lock again (read or write) while it holds the write lock,
+    or take the read lock again while it holds it
+    """
+
+    def __init__(self):
+        """ Initialize a RWLock instance
+        """
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """ Hold the lock as a reader in a with block
+        """
+        me = threading.get_ident()
+        depth = getattr(self._local, 'depth', 0)
+        if self._writer == me or depth > 0:
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+            return
+        with self._cond:
+            self._cond.wait_for(lambda: self._writer is None and
+                                self._waiting_writers == 0)
+            self._readers += 1
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """ Hold the lock as the only writer in a with block
+        """
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                self._waiting_writers += 1
+                self._cond.wait_for(lambda: self._writer is None and
+                                    self._readers == 0)
+                self._waiting_writers -= 1
+                self._writer = me
+            self._writer_depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer_depth -= 1
+                if self._writer_depth == 0:
+                    self._writer = None
+                    self._cond.notify_all()
+
+
+class Store():
+    """ Objects of one class by id, with their attribute indexes.
+    Changes take the write lock; readers iterate over an immutable
+    snapshot that is rebuilt only after a change (copy on write).
+    An entry may be the RawEntry of an object: it is built with
+    factory the first time it is read. The ids are also kept sorted,
+    for pages in id order, once a page was asked for
+    """
+
+    def __init__(self, indexed_attributes: Iterable[str] = (),
+                 factory: Callable = None):
+        """ Initialize a Store instance
+        """
+        self.lock = RWLock()
+        self.factory = factory
+        self._objects = {}
+        self._raw_count = 0
+        self._snapshot = ()
+        self._ids = None
+        self.indexes = {attr: {} for attr in indexed_attributes}
+
+    def __len__(self) -> int:
+        """ Number of objects
+        """
+        return len(self._objects)
+
+    def get(self, obj_id: str) -> TypeVar('Base'):
+        """ Return one object by id, or None
+        """
+        obj = self._objects.get(obj_id)
+        if type(obj) is not RawEntry:
+            return obj
+        with self.lock.write():
+            obj = self._objects.get(obj_id)
+            if type(obj) is RawEntry:
+                obj = self._build(obj)
+            return obj
+
+    def raw(self, obj_json: dict, source, start: int,
+            end: int) -> RawEntry:
+        """ Return the RawEntry of the JSON of an object found between
+        offsets start and end in source, obj_json being that JSON
+        decoded
+        """
+        return RawEntry(obj_json['id'], source, start, end - start, tuple(
+            obj_json.get(attr) for attr in self.indexes))
+
+    def _build(self, entry: RawEntry) -> TypeVar('Base'):
+        """ Replace a raw entry by its object, the write lock being held
+        """
+        obj = self.factory(**json.loads(entry.text()))
+        self._objects[entry.id] = obj
+        self._raw_count -= 1
+        self._snapshot = None
+        return obj
+
+    def entries(self) -> tuple:
+        """ Return a snapshot of all entries, objects or RawEntry,
+        safe to iterate while other threads change the store
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self.lock.read():
+            snapshot = tuple(self._objects.values())
+            self._snapshot = snapshot
+        return snapshot
+
+    def values(self) -> Tuple[TypeVar('Base'), ...]:
+        """ Return a snapshot of all objects, safe to iterate
+        while other threads change the store
+        """
+        if self._raw_count > 0:
+            with self.lock.write():
+                for obj in list(self._objects.values()):
+                    if type(obj) is RawEntry:
+                        self._build(obj)
+        return self.entries()
+
+    def candidates(self, attributes: dict) -> Iterable[TypeVar('Base')]:
+        """ Return the objects that may match attributes: the objects
+        indexed under the first indexed attribute, or all of them
+        """
+        for k, v in attributes.items():
+            if k not in self.indexes:
+                continue
+            with self.lock.read():
+                try:
+                    ids = list(self.indexes[k].get(v, {}))
+                except TypeError:
+                    continue
+            return [obj for obj in map(self.get, ids) if obj is not None]
+        return self.values()
+
+    def put(self, obj):
+        """ Add or replace an object, or the RawEntry of one
+        """
+        with self.lock.write():
+            self._put(obj)
+
+    def load(self, objs: Iterable):
+        """ Add many objects, or RawEntry of objects, at once
+        """
+        with self.lock.write():
+            # sorted again by the next page, not one insert at a time
+            self._ids = None
+            for obj in objs:
+                self._put(obj)
+
+    def _put(self, obj):
+        """ Add or replace an entry, the write lock being held
+        """
+        obj_id = obj.id
+        self._discard(obj_id)
+        self._objects[obj_id] = obj
+        if self._ids is not None:
+            insort(self._ids, obj_id)
+        if type(obj) is RawEntry:
+            self._raw_count += 1
+        for index, value in self._indexed_values(obj):
+            _index_add(index, value, obj_id)
+        self._snapshot = None
+
+    def discard(self, obj_id: str) -> TypeVar('Base'):
+        """ Remove an object by id and return it, or None
+        """
+        with self.lock.write():
+            return self._discard(obj_id)
+
+    def _discard(self, obj_id: str) -> TypeVar('Base'):
+        """ Remove an object, the write lock being held
+        """
+        obj = self._objects.pop(obj_id, None)
+        if obj is None:
+            return None
+        if self._ids is not None:
+            del self._ids[bisect_left(self._ids, obj_id)]
+        if type(obj) is RawEntry:
+            self._raw_count -= 1
+        for index, value in self._indexed_values(obj):
+            _index_discard(index, value, obj_id)
+        self._snapshot = None
+        return obj
+
+    def ids_after(self, after: str, limit: int) -> List[str]:
+        """ Return up to limit ids (all of them without a limit) in
+        order, starting after the id after, or at the first one
+        """
+        with self.lock.read():
+            if self._ids is not None:
+                return self._slice_ids(after, limit)
+        with self.lock.write():
+            if self._ids is None:
+                self._ids = sorted(self._objects)
+            return self._slice_ids(after, limit)
+
+    def _slice_ids(self, after: str, limit: int) -> List[str]:
+        """ Return a page of the sorted ids, the lock being held
+        """
+        start = 0 if after is None else bisect_right(self._ids, after)
+        end = None if limit is None else start + limit
+        return self._ids[start:end]
+
+    def _indexed_values(self, entry) -> Iterator[tuple]:
+        """ Yield the (index, value) pairs of the indexed attributes
+        of an entry
+        """
+        if type(entry) is RawEntry:
+            return zip(self.indexes.values(), entry.values)
+        return ((index, getattr(entry, attr, None))
+                for attr, index in self.indexes.items())
+
+    def set_attribute(self, obj: TypeVar('Base'), name: str, value):
+        """ Set an indexed attribute of an object, moving it in the
+        index if the object is stored
+        """
+        if getattr(obj, 'id', None) not in self._objects:
+            # not stored (an object being built): nothing to index
+            object.__setattr__(obj, name, value)
+            return
+        with self.lock.write():
+            index = self.indexes[name]
+            stored = self._objects.get(getattr(obj, 'id', None)) is obj
+            if stored:
+                _index_discard(index, getattr(obj, name, None), obj.id)
+            object.__setattr__(obj, name, value)
+            if stored:
+                _index_add(index, value, obj.id)
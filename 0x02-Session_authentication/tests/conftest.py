@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+""" Fixtures of the tests: the project on the import path and
+a storage of each backend in a temporary directory
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+import models.base  # noqa: E402
+from models.engine import BACKENDS, get_storage  # noqa: E402
+
+
+@pytest.fixture(params=BACKENDS)
+def storage(request, tmp_path, monkeypatch):
+    """ A fresh storage of each backend, its files in tmp_path
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("STORAGE_SQLITE_PATH", str(tmp_path / "db.sqlite3"))
+    engine = get_storage(request.param)
+    monkeypatch.setattr(models.base, "storage", engine)
+    return engine
+
+
+@pytest.fixture
+def json_storage(tmp_path, monkeypatch):
+    """ A fresh json storage, its files in tmp_path
+    """
+    monkeypatch.chdir(tmp_path)
+    engine = get_storage("json")
+    monkeypatch.setattr(models.base, "storage", engine)
+    return engine
+
+
+@pytest.fixture
+def app(storage, monkeypatch):
+    """ The API on a storage of each backend, without authentication
+    """
+    # imported here: the views load the users of the storage in use
+    from api.v1 import app as app_module
+    monkeypatch.setattr(app_module, "auth", None)
+    return app_module.app
+
+
+@pytest.fixture
+def client(app):
+    """ A test client of the API
+    """
+    return app.test_client()
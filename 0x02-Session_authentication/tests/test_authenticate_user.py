@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+""" Tests of the authentication stages of every request
+"""
+import base64
+
+import pytest
+
+from api.v1.auth.basic_auth import BasicAuth
+from models.user import User
+
+
+@pytest.fixture
+def basic_auth(client, monkeypatch):
+    """ BasicAuth counting its Authorization header reads, with a
+    saved user
+    """
+    from api.v1 import app as app_module
+    auth = BasicAuth(app_module.EXCLUDED_PATHS)
+    auth.reads = 0
+    read = auth.authorization_header
+
+    def counting_read(request=None):
+        auth.reads += 1
+        return read(request)
+
+    monkeypatch.setattr(auth, "authorization_header", counting_read)
+    monkeypatch.setattr(app_module, "auth", auth)
+    user = User(email="bob@example.com")
+    user.password = "secret"
+    user.save()
+    return auth
+
+
+def basic(credentials: str) -> dict:
+    """ Headers of a Basic authenticated request
+    """
+    return {"Authorization": "Basic " + base64.b64encode(
+        credentials.encode()).decode()}
+
+
+@pytest.mark.parametrize("headers, status", [
+    ({}, 401),
+    (basic("bob@example.com:wrong"), 403),
+    (basic("alice@example.com:secret"), 403),
+    ({"Authorization": "Bearer token"}, 403),
+    (basic("bob@example.com:secret"), 200),
+])
+def test_statuses(client, basic_auth, headers, status):
+    """ 401 without credentials, 403 with wrong ones, and the
+    Authorization header is read once per request
+    """
+    for _ in range(2):
+        basic_auth.reads = 0
+        response = client.get("/api/v1/stats", headers=headers)
+        assert response.status_code == status
+        assert basic_auth.reads == 1
+
+
+def test_excluded_path(client, basic_auth):
+    """ Excluded paths read no credentials
+    """
+    assert client.get("/api/v1/status").status_code == 200
+    assert basic_auth.reads == 0
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+""" Tests of the json FileStorage
+"""
+import json
+import os
+import stat
+import threading
+import time
+
+import pytest
+
+import models.base
+from models.engine import file_storage, get_storage
+from models.user import User
+
+
+def test_group_commit_retries_failed_writes(json_storage, monkeypatch):
+    """ Changes whose write failed stay pending and are written by
+    the next attempt of the flusher
+    """
+    monkeypatch.setattr(file_storage, "FLUSH_INTERVAL", 0.01)
+    write_changes = json_storage.write_changes
+    failures = []
+
+    def failing_write(cls, obj_ids):
+        if len(failures) < 2:
+            failures.append(obj_ids)
+            raise OSError("No space left on device")
+        write_changes(cls, obj_ids)
+
+    monkeypatch.setattr(json_storage, "write_changes", failing_write)
+    user = User(email="bob@example.com")
+    user.save()
+    assert json_storage.wait_for_flush(5)
+    assert failures == [[user.id], [user.id]]
+    assert json_storage._flusher.is_alive()
+    with open(".db_User.json") as f:
+        assert user.id in json.load(f)
+
+
+def test_save_does_not_wait_for_group_commit(json_storage, monkeypatch):
+    """ A save made while the group commit writes the files returns
+    at once, and is written by the next flush
+    """
+    monkeypatch.setattr(file_storage, "FLUSH_INTERVAL", 0.01)
+    writing, release = threading.Event(), threading.Event()
+    write_atomic = file_storage._write_atomic
+
+    def slow_write(file_path, content):
+        writing.set()
+        release.wait(5)
+        write_atomic(file_path, content)
+
+    monkeypatch.setattr(file_storage, "_write_atomic", slow_write)
+    User(email="bob@example.com").save()
+    assert writing.wait(5)
+    start = time.monotonic()
+    user = User(email="alice@example.com")
+    user.save()
+    assert json_storage.get(User, user.id) is user
+    assert time.monotonic() - start < 1
+    release.set()
+    assert json_storage.wait_for_flush(5)
+    with open(".db_User.json") as f:
+        assert user.id in json.load(f)
+
+
+def test_snapshot_keeps_file_mode(json_storage):
+    """ A rewritten snapshot keeps the mode of the file it replaces,
+    and a new one gets the mode open() would give it
+    """
+    umask = os.umask(0)
+    os.umask(umask)
+    User(email="bob@example.com").save()
+    assert stat.S_IMODE(os.stat(".db_User.json").st_mode) == \
+        0o666 & ~umask
+    os.chmod(".db_User.json", 0o640)
+    User(email="alice@example.com").save()
+    assert stat.S_IMODE(os.stat(".db_User.json").st_mode) == 0o640
+
+
+def run_changes(tmp_path, monkeypatch, mode):
+    """ Save, update and remove users in a STORAGE_MODE, return the
+    users a new storage loads from the files, save their updated_at
+    """
+    tmp_path.mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(file_storage, "STORAGE_MODE", mode)
+    monkeypatch.setattr(file_storage, "JOURNAL_MIN_ENTRIES", 3)
+    engine = get_storage("json")
+    monkeypatch.setattr(models.base, "storage", engine)
+    users = [User(id="user-{}".format(i),
+                  created_at="2024-01-01T00:00:00",
+                  email="user{}@example.com".format(i))
+             for i in range(8)]
+    for user in users:
+        user.save()
+    for user in users[:5]:
+        user.first_name = "Bob"
+        user.save()
+    for user in users[5:7]:
+        user.remove()
+    fresh = get_storage("json")
+    fresh.load(User)
+    loaded = {}
+    for user in fresh.search(User, {}):
+        loaded[user.id] = user.to_json(True)
+        del loaded[user.id]["updated_at"]
+    return loaded
+
+
+def test_journal_compacts_to_write_through_state(
+        tmp_path, monkeypatch):
+    """ The journal is compacted into the snapshot once it outgrows
+    the objects, and reloads the same objects as write-through
+    """
+    snapshot = run_changes(tmp_path / "snapshot", monkeypatch,
+                           "snapshot")
+    compactions = []
+    compact = file_storage.FileStorage.compact
+
+    def counting_compact(self, cls):
+        compactions.append(cls)
+        compact(self, cls)
+
+    monkeypatch.setattr(file_storage.FileStorage, "compact",
+                        counting_compact)
+    journal = run_changes(tmp_path / "journal", monkeypatch, "journal")
+    # the first update makes 9 entries for 8 users: compacted, then
+    # the 4 other updates and 2 removals are left in the journal
+    assert compactions == [User]
+    with open(".db_User.journal") as f:
+        assert len(f.readlines()) == 6
+    assert journal == snapshot
+    assert sorted(journal) == [
+        "user-{}".format(i) for i in (0, 1, 2, 3, 4, 7)]
+    assert journal["user-0"]["first_name"] == "Bob"
+
+
+def write_two_users(engine):
+    """ Save two users one at a time: the snapshot has both, its
+    backup only the first
+    """
+    first = User(email="bob@example.com")
+    first.save()
+    second = User(email="alice@example.com")
+    second.save()
+    engine.flush()
+    return first, second
+
+
+def test_torn_snapshot_falls_back_on_backup(json_storage, caplog):
+    """ A torn snapshot is replaced by its backup, with a warning
+    """
+    first, second = write_two_users(json_storage)
+    with open(".db_User.json", "r+") as f:
+        f.truncate(os.path.getsize(".db_User.json") // 2)
+    fresh = get_storage("json")
+    with caplog.at_level("WARNING", logger=file_storage.__name__):
+        fresh.load(User)
+    assert fresh.get(User, first.id) is not None
+    assert fresh.get(User, second.id) is None
+    assert "loaded its backup .db_User.json.bak" in caplog.text
+
+
+def test_checksum_mismatch_falls_back_on_backup(
+        json_storage, monkeypatch, caplog):
+    """ With STORAGE_CHECKSUM, a snapshot changed behind the storage's
+    back fails its checksum and is replaced by its backup
+    """
+    monkeypatch.setattr(file_storage, "STORAGE_CHECKSUM", True)
+    first, second = write_two_users(json_storage)
+    with open(".db_User.json") as f:
+        content = f.read()
+    with open(".db_User.json", "w") as f:
+        f.write(content.replace("alice@", "mallory@"))
+    fresh = get_storage("json")
+    with caplog.at_level("WARNING", logger=file_storage.__name__):
+        fresh.load(User)
+    assert fresh.get(User, first.id) is not None
+    assert fresh.get(User, second.id) is None
+    assert "Checksum mismatch" in caplog.text
+
+
+def test_torn_snapshot_without_backup_raises(json_storage):
+    """ A torn snapshot without a backup is an error, not an empty
+    class
+    """
+    User(email="bob@example.com").save()
+    json_storage.flush()
+    assert not os.path.exists(".db_User.json.bak")
+    with open(".db_User.json", "r+") as f:
+        f.truncate(os.path.getsize(".db_User.json") - 2)
+    with pytest.raises(ValueError, match="no valid backup"):
+        get_storage("json").load(User)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+""" Tests of the lazy load of the json FileStorage (STORAGE_LAZY=1)
+"""
+import json
+
+import pytest
+
+from models.engine import file_storage, get_storage
+from models.store import RawEntry
+from models.user import User
+
+
+USERS = 5
+
+
+@pytest.fixture
+def lazy_storage(json_storage, monkeypatch):
+    """ A json storage loading USERS users lazily from a snapshot
+    written by hand, keys in an unusual order
+    """
+    monkeypatch.setattr(file_storage, "STORAGE_LAZY", True)
+    with open(".db_User.json", "w") as f:
+        f.write("{" + ", ".join(
+            '"user-{0}": {{"email": "user{0}@example.com", '
+            '"first_name": "User {0}", "id": "user-{0}", '
+            '"created_at": "2024-01-01T00:00:00", '
+            '"updated_at": "2024-01-01T00:00:00"}}'.format(i)
+            for i in range(USERS)) + "}")
+    json_storage.load(User)
+    return json_storage
+
+
+def built(storage):
+    """ Number of users built from their raw entry
+    """
+    return sum(type(entry) is not RawEntry
+               for entry in storage.store(User).entries())
+
+
+def test_load_keeps_raw_entries(lazy_storage):
+    """ Loading builds no user and indexes them from their raw JSON
+    """
+    store = lazy_storage.store(User)
+    assert built(lazy_storage) == 0
+    assert store.indexes["email"]["user3@example.com"] == {"user-3": None}
+    assert len(store.indexes["email"]) == USERS
+    assert lazy_storage.count(User) == USERS
+    assert built(lazy_storage) == 0
+
+
+def test_get_builds_one_entry(lazy_storage):
+    """ get builds the user it returns, and only it
+    """
+    user = lazy_storage.get(User, "user-2")
+    assert type(user) is User
+    assert user.first_name == "User 2"
+    assert user.created_at.year == 2024
+    assert lazy_storage.get(User, "user-2") is user
+    assert built(lazy_storage) == 1
+
+
+def test_indexed_search_builds_matches(lazy_storage):
+    """ A search on an indexed attribute builds the matching users
+    """
+    users = lazy_storage.search(User, {"email": "user4@example.com"})
+    assert [user.id for user in users] == ["user-4"]
+    assert built(lazy_storage) == 1
+
+
+def test_search_and_all_build_every_entry(lazy_storage):
+    """ A search on other attributes and all() build every user
+    """
+    users = lazy_storage.search(User, {"first_name": "User 1"})
+    assert [user.id for user in users] == ["user-1"]
+    assert built(lazy_storage) == USERS
+    assert sorted(user.id for user in User.all()) == \
+        ["user-{}".format(i) for i in range(USERS)]
+
+
+def test_save_writes_raw_entries_unchanged(lazy_storage):
+    """ A snapshot rewrite copies the entries not built as they were
+    read, and the changed ones from their objects
+    """
+    with open(".db_User.json") as f:
+        before = f.read()
+    user = lazy_storage.get(User, "user-0")
+    user.first_name = "Bob"
+    user.save()
+    with open(".db_User.json") as f:
+        after = f.read()
+    raw = [entry.text() for entry in lazy_storage.store(User).entries()
+           if type(entry) is RawEntry]
+    assert len(raw) == USERS - 1
+    assert all(text in before and text in after for text in raw)
+    assert json.loads(after)["user-0"]["first_name"] == "Bob"
+    fresh = get_storage("json")
+    fresh.load(User)
+    assert fresh.get(User, "user-0").first_name == "Bob"
+    assert fresh.get(User, "user-1").first_name == "User 1"
+
+
+def test_checksum_covers_raw_entries(lazy_storage, monkeypatch):
+    """ Entries written back raw are part of the snapshot checksum
+    """
+    monkeypatch.setattr(file_storage, "STORAGE_CHECKSUM", True)
+    User(email="bob@example.com").save()
+    fresh = get_storage("json")
+    fresh.load(User)
+    assert fresh.count(User) == USERS + 1
+    assert built(fresh) == 0
+
+
+def test_raw_entries_of_utf8_snapshot(json_storage, monkeypatch):
+    """ Entries are found by their offsets in bytes in a snapshot
+    holding UTF-8 text, not ASCII only, read in chunks that split
+    its characters
+    """
+    monkeypatch.setattr(file_storage, "STORAGE_LAZY", True)
+    monkeypatch.setattr(file_storage, "READ_CHUNK_SIZE", 5)
+    names = ["Zoé", "Jürgen ✓", "Ann"]
+    with open(".db_User.json", "w", encoding="utf-8") as f:
+        json.dump({"user-{}".format(i): {
+            "id": "user-{}".format(i), "first_name": name,
+            "email": "{}@example.com".format(name)}
+            for i, name in enumerate(names)}, f, ensure_ascii=False)
+    json_storage.load(User)
+    assert built(json_storage) == 0
+    for i, name in enumerate(names):
+        assert json_storage.get(User, "user-{}".format(i)).first_name == \
+            name
+    assert json_storage.search(User, {"email": "Ann@example.com"})[0].id \
+        == "user-2"
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+""" Tests of the metrics and of /api/v1/metrics
+"""
+import base64
+
+import pytest
+
+from api.v1.auth.basic_auth import BasicAuth
+from models import metrics
+from models.engine.db_storage import SQLiteStorage
+from models.engine.memory_storage import MemoryStorage
+from models.user import User
+
+
+def sample(name: str, **labels: str) -> float:
+    """ Value of a counter, or count of a histogram, 0 if unknown
+    """
+    metric = metrics.REGISTRY.get((name, tuple(sorted(labels.items()))))
+    if metric is None:
+        return 0
+    return metric.value if metric.type == "counter" else metric.count
+
+
+def test_render():
+    """ Histograms and counters in the Prometheus text format
+    """
+    hist = metrics.histogram("test_seconds", "Test histogram", kind="a")
+    hist.observe(0.003)
+    hist.observe(10)
+    count = metrics.counter("test_total", "Test counter", kind="b")
+    count.inc()
+    count.inc(2)
+    text = metrics.render()
+    assert "# TYPE test_seconds histogram\n" in text
+    assert 'test_seconds_bucket{kind="a",le="0.0025"} 0\n' in text
+    assert 'test_seconds_bucket{kind="a",le="0.005"} 1\n' in text
+    assert 'test_seconds_bucket{kind="a",le="+Inf"} 2\n' in text
+    assert 'test_seconds_count{kind="a"} 2\n' in text
+    assert "# TYPE test_total counter\n" in text
+    assert 'test_total{kind="b"} 3\n' in text
+    with pytest.raises(ValueError):
+        metrics.counter("test_seconds", "Not a counter", kind="a")
+
+
+def test_storage_writes_are_timed(storage):
+    """ Writes of every backend that touch the disk are timed
+    """
+    if type(storage) is MemoryStorage:
+        pytest.skip("nothing is written in memory")
+    if isinstance(storage, SQLiteStorage):
+        operations = ["save"]
+    else:
+        operations = ["write_changes", "save_to_file"]
+    before = [sample("model_operation_seconds", operation=operation)
+              for operation in operations]
+    User(email="bob@example.com").save()
+    assert [sample("model_operation_seconds", operation=operation)
+            for operation in operations] == [count + 1 for count in before]
+
+
+def test_cache_counters(client, monkeypatch):
+    """ Hits and misses of the credential cache are counted
+    """
+    from api.v1 import app as app_module
+    monkeypatch.setattr(app_module, "auth",
+                        BasicAuth(app_module.EXCLUDED_PATHS))
+    user = User(email="bob@example.com")
+    user.password = "secret"
+    user.save()
+    headers = {"Authorization": "Basic " + base64.b64encode(
+        b"bob@example.com:secret").decode()}
+    hits = sample("basic_auth_cache_hits_total")
+    misses = sample("basic_auth_cache_misses_total")
+    for _ in range(3):
+        assert client.get("/api/v1/stats", headers=headers).status_code == 200
+    assert sample("basic_auth_cache_hits_total") == hits + 2
+    assert sample("basic_auth_cache_misses_total") == misses + 1
+    text = client.get("/api/v1/metrics", headers=headers).data.decode()
+    # the metrics request was one more hit
+    assert "basic_auth_cache_hits_total {}\n".format(hits + 3) in text
+    assert 'model_operation_seconds_count{operation="search"}' in text
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+""" Model tests run against every storage backend
+"""
+from datetime import datetime
+
+import models.base
+from models.engine import get_storage
+from models.engine.db_storage import SQLiteStorage
+from models.user import User
+from models.user_session import UserSession
+
+
+def new_user(**kwargs) -> User:
+    """ Save and return a user
+    """
+    user = User(**kwargs)
+    user.save()
+    return user
+
+
+def test_save_and_get(storage):
+    """ A saved object is found by id with the same attributes
+    """
+    user = new_user(email="bob@example.com", first_name="Bob")
+    user.password = "secret"
+    user.save()
+    found = User.get(user.id)
+    assert found == user
+    assert found.to_json(True) == user.to_json(True)
+    assert found.is_valid_password("secret")
+    assert found.display_name() == "Bob"
+    assert User.get("unknown") is None
+
+
+def test_count_all_and_remove(storage):
+    """ count and all follow saves and removals, in save order
+    """
+    users = [new_user(email="user{}@example.com".format(i))
+             for i in range(5)]
+    assert User.count() == 5
+    assert [user.id for user in User.all()] == [user.id for user in users]
+    users[1].remove()
+    assert User.count() == 4
+    assert User.get(users[1].id) is None
+    assert users[1] not in User.all()
+    # saving again updates, it does not add
+    users[0].first_name = "First"
+    users[0].save()
+    assert User.count() == 4
+    assert User.get(users[0].id).first_name == "First"
+
+
+def test_search(storage):
+    """ search matches every attribute, indexed or not
+    """
+    bob = new_user(email="bob@example.com", first_name="Bob")
+    bob2 = new_user(email="bob2@example.com", first_name="Bob")
+    alice = new_user(email="alice@example.com", first_name="Alice")
+    assert User.search({'email': "bob@example.com"}) == [bob]
+    assert User.search({'first_name': "Bob"}) == [bob, bob2]
+    assert User.search({'first_name': "Bob",
+                        'email': "bob2@example.com"}) == [bob2]
+    assert User.search({'id': alice.id}) == [alice]
+    assert User.search({'last_name': None}) == [bob, bob2, alice]
+    assert User.search({'email': "nobody@example.com"}) == []
+    assert User.search() == [bob, bob2, alice]
+
+
+def test_search_after_saved_change(storage):
+    """ A saved change of an indexed attribute moves the object
+    """
+    user = new_user(email="old@example.com")
+    user.email = "new@example.com"
+    user.save()
+    assert User.search({'email': "old@example.com"}) == []
+    assert User.search({'email': "new@example.com"}) == [user]
+
+
+def test_page(storage):
+    """ page lists objects by id after a cursor, following saves and
+    removals made after the first page
+    """
+    users = [new_user(id="user-{:02d}".format(i)) for i in range(0, 20, 2)]
+    assert [user.id for user in User.page(limit=3)] == \
+        ["user-00", "user-02", "user-04"]
+    assert [user.id for user in User.page("user-04", 2)] == \
+        ["user-06", "user-08"]
+    assert [user.id for user in User.page("user-05", 2)] == \
+        ["user-06", "user-08"]
+    assert len(User.page()) == len(users)
+    assert User.page("user-18") == []
+    new_user(id="user-07")
+    users[4].remove()
+    users[3].save()
+    assert [user.id for user in User.page("user-04", 3)] == \
+        ["user-06", "user-07", "user-10"]
+    assert [user.id for user in User.page()] == sorted(
+        ["user-07"] + [user.id for user in users if user.id != "user-08"])
+
+
+def test_classes_are_separate(storage):
+    """ Each model class has its own objects
+    """
+    user = new_user(email="bob@example.com")
+    session = UserSession(user_id=user.id, session_id="abc")
+    session.save()
+    assert User.count() == 1
+    assert UserSession.search({'session_id': "abc"}) == [session]
+    assert UserSession.get(user.id) is None
+
+
+def test_timestamps(storage):
+    """ Timestamps come back as datetimes, to the second
+    """
+    user = new_user(email="bob@example.com")
+    found = User.get(user.id)
+    assert type(found.created_at) is datetime
+    assert found.to_json()['created_at'] == user.to_json()['created_at']
+
+
+def test_persistence(storage, monkeypatch):
+    """ json and sqlite objects survive a new storage of the same
+    files, memory ones do not
+    """
+    user = new_user(email="bob@example.com")
+    models.base.flush()
+    name = {'FileStorage': "json", 'MemoryStorage': "memory",
+            'SQLiteStorage': "sqlite"}[type(storage).__name__]
+    monkeypatch.setattr(models.base, "storage", get_storage(name))
+    User.load_from_file()
+    if name == "memory":
+        assert User.count() == 0
+    else:
+        assert User.get(user.id) == user
+        assert User.search({'email': "bob@example.com"}) == [user]
+
+
+def test_identity(storage):
+    """ Pins the documented identity semantics (see models.engine):
+    json and memory return the stored objects themselves, so
+    unsaved changes are seen; sqlite builds new objects from the
+    saved rows, so only saved changes are seen
+    """
+    user = new_user(email="bob@example.com", first_name="Bob")
+    found = User.get(user.id)
+    found.first_name = "Robert"
+    found.email = "robert@example.com"
+    if isinstance(storage, SQLiteStorage):
+        assert found is not user
+        assert User.get(user.id) is not found
+        assert User.get(user.id).first_name == "Bob"
+        assert User.search({'email': "robert@example.com"}) == []
+    else:
+        assert found is user
+        assert User.get(user.id) is found
+        assert User.search({'email': "robert@example.com"}) == [user]
+    found.save()
+    assert User.get(user.id).first_name == "Robert"
+    assert User.search({'email': "robert@example.com"}) == [user]
+    assert User.search({'email': "bob@example.com"}) == []
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+""" Tests of the json storage shared by several processes
+"""
+import json
+import multiprocessing
+
+import pytest
+
+import models.base
+from models.engine import file_storage
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+PROCESSES = 4
+USERS = 25
+
+fork = multiprocessing.get_context("fork")
+
+
+def save_users(worker: int):
+    """ Save USERS users from a new storage of this process
+    """
+    models.base.storage = FileStorage()
+    User.load_from_file()
+    for i in range(USERS):
+        User(email="worker{}-{}@example.com".format(worker, i)).save()
+
+
+@pytest.mark.parametrize("mode", ["snapshot", "journal"])
+def test_concurrent_writers(mode, json_storage, monkeypatch):
+    """ Users saved at the same time by several processes are all
+    written, and seen by a process that loaded before them
+    """
+    monkeypatch.setattr(file_storage, "STORAGE_MODE", mode)
+    User.load_from_file()
+    assert User.count() == 0
+    workers = [fork.Process(target=save_users, args=(worker,))
+               for worker in range(PROCESSES)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [worker.exitcode for worker in workers] == [0] * PROCESSES
+    assert User.count() == PROCESSES * USERS
+    assert len(User.search({'email': "worker3-24@example.com"})) == 1
+    models.base.storage = FileStorage()
+    User.load_from_file()
+    assert User.count() == PROCESSES * USERS
+
+
+def test_torn_journal_line(json_storage, monkeypatch):
+    """ The torn last line of an interrupted append is ignored by
+    readers and replaced by the next append
+    """
+    monkeypatch.setattr(file_storage, "STORAGE_MODE", "journal")
+    bob = User(email="bob@example.com")
+    bob.save()
+    with open(".db_User.journal", "ab") as f:
+        f.write(b'{"id": "torn", "obj": {"id": "to')
+    reader = FileStorage()
+    reader.load(User)
+    assert reader.count(User) == 1
+    alice = User(email="alice@example.com")
+    alice.save()
+    with open(".db_User.journal", "rb") as f:
+        lines = f.read().splitlines(True)
+    assert [json.loads(line)['id'] for line in lines] == [bob.id, alice.id]
+    assert reader.get(User, alice.id) == alice
+    assert reader.get(User, "torn") is None
+
+
+def test_journal_offsets_in_bytes(json_storage, monkeypatch):
+    """ Readers catch up with new journal entries alone, from byte
+    offsets that stay right with multi-byte characters
+    """
+    monkeypatch.setattr(file_storage, "STORAGE_MODE", "journal")
+    reader = FileStorage()
+    reader.load(User)
+
+    def no_reload(cls):
+        raise AssertionError("the reader reloaded the whole file")
+
+    monkeypatch.setattr(reader, "_load", no_reload)
+    for name in ("zoë", "żółw", "猫", "bob"):
+        user = User(email="{}@example.com".format(name), first_name=name)
+        user.save()
+        assert reader.search(User, {'email': user.email}) == [user]
+        assert reader.get(User, user.id).first_name == name
+        with open(".db_User.journal", "rb") as f:
+            size = len(f.read())
+        assert reader.signatures['User'][1] == size
+    user.remove()
+    assert reader.get(User, user.id) is None
+    assert reader.count(User) == 3
+
+
+@pytest.mark.parametrize("mode", ["snapshot", "journal"])
+def test_snapshot_mode_warns_of_reloads(mode, json_storage, monkeypatch,
+                                        caplog):
+    """ A process reloading a snapshot rewritten by another one warns,
+    once, that shared files should use the journal mode
+    """
+    monkeypatch.setattr(file_storage, "STORAGE_MODE", mode)
+    reader = FileStorage()
+    reader.load(User)
+    for i in range(3):
+        User(email="user{}@example.com".format(i)).save()
+        assert reader.count(User) == i + 1
+    warnings = [record for record in caplog.records
+                if "STORAGE_MODE=journal" in record.getMessage()]
+    assert len(warnings) == (1 if mode == "snapshot" else 0)
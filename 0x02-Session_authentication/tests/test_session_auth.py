@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+""" Tests of the session authentication views
+"""
+import pytest
+
+from api.v1.auth.auth import Auth
+from api.v1.auth.basic_auth import BasicAuth
+from api.v1.auth.session_auth import SessionAuth
+from api.v1.auth.session_db_auth import SessionDBAuth
+from api.v1.auth.session_exp_auth import SessionExpAuth
+from models.user import User
+
+SESSION_NAME = "_my_session_id"
+
+
+@pytest.fixture
+def bob(client, monkeypatch):
+    """ A saved user, the session cookie being SESSION_NAME
+    """
+    monkeypatch.setenv("SESSION_NAME", SESSION_NAME)
+    user = User(email="bob@example.com")
+    user.password = "secret"
+    user.save()
+    return user
+
+
+def use_auth(monkeypatch, auth):
+    """ Make the API authenticate with auth
+    """
+    from api.v1 import app as app_module
+    monkeypatch.setattr(app_module, "auth", auth)
+
+
+def login(client, password: str = "secret"):
+    """ POST /api/v1/auth_session/login as bob
+    """
+    return client.post("/api/v1/auth_session/login", data={
+        'email': "bob@example.com", 'password': password})
+
+
+@pytest.mark.parametrize("auth_class", [
+    SessionAuth, SessionExpAuth, SessionDBAuth])
+def test_login_logout(client, bob, monkeypatch, auth_class):
+    """ A session opened by login authenticates requests until logout
+    """
+    from api.v1.app import EXCLUDED_PATHS
+    use_auth(monkeypatch, auth_class(EXCLUDED_PATHS))
+    assert client.get("/api/v1/users").status_code == 401
+    response = login(client)
+    assert response.status_code == 200
+    assert response.get_json()['id'] == bob.id
+    assert SESSION_NAME + "=" in response.headers['Set-Cookie']
+    assert client.get("/api/v1/users").status_code == 200
+    assert client.delete("/api/v1/auth_session/logout").status_code == 200
+    assert client.get("/api/v1/users").status_code == 403
+
+
+def test_login_errors(client, bob, monkeypatch):
+    """ Missing fields, unknown emails and wrong passwords
+    """
+    use_auth(monkeypatch, SessionAuth())
+    url = "/api/v1/auth_session/login"
+    assert client.post(url, data={'password': "secret"}).status_code == 400
+    assert client.post(url, data={'email': "bob@example.com"}) \
+        .status_code == 400
+    assert client.post(url, data={
+        'email': "alice@example.com", 'password': "x"}).status_code == 404
+    assert login(client, "wrong").status_code == 401
+
+
+@pytest.mark.parametrize("auth_class", [Auth, BasicAuth])
+def test_login_without_session_auth(client, bob, monkeypatch, auth_class):
+    """ Without session authentication, login is not found, whether
+    the password is right or wrong
+    """
+    from api.v1.app import EXCLUDED_PATHS
+    use_auth(monkeypatch, auth_class(EXCLUDED_PATHS))
+    assert login(client).status_code == 404
+    assert login(client, "wrong").status_code == 404
+
+
+def test_no_auth(client, bob, monkeypatch):
+    """ Without authentication, login and logout are not found
+    """
+    use_auth(monkeypatch, None)
+    assert login(client).status_code == 404
+    assert client.delete("/api/v1/auth_session/logout").status_code == 404
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+""" Tests of the streaming snapshot parser of the json storage
+"""
+import io
+import json
+
+import pytest
+
+from models.engine import file_storage
+from models.engine.file_storage import _iter_json_object
+
+DOCUMENT = json.dumps({
+    "a": "plain",
+    "esc\"aped\\": "quote \" backslash \\ slash / unicode é \n",
+    "": {"nested": {"deeper": [1, 2, {"x": None}]}, "s": "}{,:"},
+    "int": 1234567890,
+    "negative": -42,
+    "float": 3.25e-10,
+    "exp": 1E+20,
+    "decimal": 0.5,
+    "list": [True, False, None, "", [], {}],
+    "last": "end",
+}, indent=1).replace('"exp": 1e+20', '"exp": 1E+20')
+
+
+def parse(document: str) -> list:
+    """ All the pairs the parser yields from a document
+    """
+    return list(_iter_json_object(io.StringIO(document)))
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 40))
+def test_every_chunk_boundary(chunk_size, monkeypatch):
+    """ The document parses the same whatever the chunk size, so
+    every token is cut at every position by some chunk boundary
+    """
+    monkeypatch.setattr(file_storage, "READ_CHUNK_SIZE", chunk_size)
+    assert parse(DOCUMENT) == list(json.loads(DOCUMENT).items())
+
+
+@pytest.mark.parametrize("document", ["{}", " { } ", "\n{\n}\n"])
+@pytest.mark.parametrize("chunk_size", [1, 2, 1 << 16])
+def test_empty_object(document, chunk_size, monkeypatch):
+    """ An empty object yields nothing
+    """
+    monkeypatch.setattr(file_storage, "READ_CHUNK_SIZE", chunk_size)
+    assert parse(document) == []
+
+
+@pytest.mark.parametrize("end", range(len(DOCUMENT)))
+def test_torn_document(end, monkeypatch):
+    """ Every truncation of a document is detected
+    """
+    monkeypatch.setattr(file_storage, "READ_CHUNK_SIZE", 7)
+    with pytest.raises(ValueError):
+        parse(DOCUMENT[:end])
+
+
+@pytest.mark.parametrize("document", [
+    '[]', '{"a" 1}', '{"a": 1,}', '{"a": 1 "b": 2}', '{1: 2}',
+    '{"a": 1}}', '{"a": 1.}', '{"a": tru}'])
+def test_invalid_document(document, monkeypatch):
+    """ Invalid documents raise ValueError
+    """
+    monkeypatch.setattr(file_storage, "READ_CHUNK_SIZE", 3)
+    with pytest.raises(ValueError):
+        parse(document)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+""" Stress tests of RWLock and Store under many threads
+"""
+import threading
+
+from models.store import RWLock, Store
+from models.user import User
+
+THREADS = 16
+ROUNDS = 300
+
+
+def run_threads(*targets):
+    """ Run each target in THREADS threads, return their exceptions
+    """
+    errors = []
+
+    def run(target):
+        try:
+            target()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(target,))
+               for target in targets for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_rwlock_no_lost_updates():
+    """ Writers never interleave, readers never see a half update,
+    and a writer may take the lock again
+    """
+    lock = RWLock()
+    state = {'a': 0, 'b': 0}
+    torn = []
+
+    def write():
+        for _ in range(ROUNDS):
+            with lock.write():
+                a = state['a']
+                with lock.read():
+                    state['a'] = a + 1
+                with lock.write():
+                    state['b'] += 1
+
+    def read():
+        for _ in range(ROUNDS):
+            with lock.read():
+                with lock.read():
+                    if state['a'] != state['b']:
+                        torn.append(dict(state))
+
+    assert run_threads(write, read) == []
+    assert torn == []
+    assert state == {'a': THREADS * ROUNDS, 'b': THREADS * ROUNDS}
+
+
+def test_store_concurrent_changes():
+    """ Puts, discards, index updates and iteration from many threads
+    lose no object and raise nothing
+    """
+    store = Store(('email',), User)
+    kept = []
+    kept_lock = threading.Lock()
+
+    def change():
+        for i in range(ROUNDS):
+            user = User(email="user@example.com")
+            store.put(user)
+            store.set_attribute(user, 'email',
+                                "user{}@example.com".format(i))
+            if i % 2 == 0:
+                assert store.discard(user.id) is user
+            else:
+                with kept_lock:
+                    kept.append(user)
+
+    def read():
+        for _ in range(ROUNDS):
+            for user in store.values():
+                assert user.id is not None
+            store.candidates({'email': "user@example.com"})
+            len(store)
+
+    assert run_threads(change, read) == []
+    assert len(store) == len(kept) == THREADS * ROUNDS // 2
+    for user in kept:
+        assert store.get(user.id) is user
+        assert user.id in store.indexes['email'][user.email]
+    assert "user@example.com" not in store.indexes['email']
+
+
+def test_models_concurrent_saves(storage):
+    """ Users saved from many threads while others list and search
+    them are all stored, in every backend
+    """
+    def save():
+        for i in range(ROUNDS // 10):
+            User(email="user{}@example.com".format(i)).save()
+
+    def read():
+        for i in range(ROUNDS // 10):
+            User.all()
+            User.search({'email': "user{}@example.com".format(i)})
+            User.count()
+
+    assert run_threads(save, read) == []
+    assert User.count() == THREADS * (ROUNDS // 10)
+    assert len(User.search({'email': "user0@example.com"})) == THREADS
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+""" Tests of the timestamp codec of the models
+"""
+from datetime import datetime
+
+import pytest
+
+from models.base import TIMESTAMP_FORMAT, format_timestamp, parse_timestamp
+
+DATETIMES = [
+    datetime(2024, 1, 5, 1, 2, 3),
+    datetime(2024, 12, 31, 23, 59, 59),
+    datetime(2000, 2, 29, 0, 0, 0),
+    datetime(1970, 1, 1),
+    datetime(1000, 1, 1),
+    datetime(9999, 12, 31, 23, 59, 59),
+    datetime(2024, 1, 5, 1, 2, 3, 999999),
+]
+
+
+@pytest.mark.parametrize("value", DATETIMES)
+def test_round_trip(value):
+    """ A formatted datetime is strftime's string and parses back
+    to the datetime, to the second
+    """
+    text = format_timestamp(value)
+    assert text == value.strftime(TIMESTAMP_FORMAT)
+    assert parse_timestamp(text) == value.replace(microsecond=0)
+
+
+@pytest.mark.parametrize("value", [
+    datetime(1, 1, 1), datetime(999, 12, 31, 23, 59, 59),
+    datetime(42, 6, 7, 8, 9, 10)])
+def test_years_before_1000(value):
+    """ Years below 1000 are formatted by strftime, as before the
+    codec, whatever the platform pads them to
+    """
+    assert format_timestamp(value) == value.strftime(TIMESTAMP_FORMAT)
+
+
+@pytest.mark.parametrize("text", [
+    "2024-01-05T01:02:03",
+    "2024-1-5T1:2:3",
+    "0999-12-31T23:59:59",
+    "2024-01-05T01:02:0٣",
+])
+def test_parse_like_strptime(text):
+    """ Strings strptime accepts parse to the same datetime
+    """
+    assert parse_timestamp(text) == datetime.strptime(text,
+                                                      TIMESTAMP_FORMAT)
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "2024-01-05",
+    "2024-01-05 01:02:03",
+    "2024-01-05T01:02:03Z",
+    "2024-01-05T01:02:03.5",
+    "2024-01-05T01:02:03+00:00",
+    "2024-01-05T01:02:3Z",
+    "2024-01-05T24:00:00",
+    "2024-02-30T00:00:00",
+    "2024-01-05T01:02:60",
+    "0000-01-05T01:02:03",
+    "20240105T01:02:03X",
+    " 2024-01-05T01:02:03",
+])
+def test_reject_like_strptime(text):
+    """ Strings strptime rejects raise ValueError, even those
+    fromisoformat accepts
+    """
+    with pytest.raises(ValueError):
+        datetime.strptime(text, TIMESTAMP_FORMAT)
+    with pytest.raises(ValueError):
+        parse_timestamp(text)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+""" Tests of GET /api/v1/users
+"""
+import json
+
+import pytest
+
+from models.user import User
+
+
+@pytest.fixture
+def users(client):
+    """ 10 saved users
+    """
+    saved = [User(email="user{}@example.com".format(i)) for i in range(10)]
+    for user in saved:
+        user.save()
+    return saved
+
+
+def pages(client, limit: int, **params) -> list:
+    """ Follow X-Next-Cursor, return the users of each page
+    """
+    result, cursor = [], None
+    while True:
+        query = dict(params, limit=limit)
+        if cursor is not None:
+            query['cursor'] = cursor
+        response = client.get("/api/v1/users", query_string=query)
+        assert response.status_code == 200
+        result.append(json.loads(response.data))
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            return result
+
+
+def test_list_all(client, users):
+    """ Without parameters every user is listed
+    """
+    response = client.get("/api/v1/users")
+    assert response.status_code == 200
+    assert response.headers.get('X-Next-Cursor') is None
+    assert [user['id'] for user in json.loads(response.data)] == \
+        [user.id for user in users]
+
+
+def test_pages(client, users):
+    """ Pages list every user once, by id
+    """
+    result = pages(client, 3)
+    assert [len(page) for page in result] == [3, 3, 3, 1]
+    assert [user['id'] for page in result for user in page] == \
+        sorted(user.id for user in users)
+
+
+def test_removal_between_pages(client, users):
+    """ Removing users already listed, including the last one of the
+    page, does not skip any user of the next pages
+    """
+    ids = sorted(user.id for user in users)
+    response = client.get("/api/v1/users?limit=4")
+    first = [user['id'] for user in json.loads(response.data)]
+    assert first == ids[:4]
+    assert response.headers['X-Next-Cursor'] == ids[3]
+    for user in users:
+        if user.id in (ids[0], ids[3]):
+            user.remove()
+    response = client.get("/api/v1/users?limit=4&cursor=" + ids[3])
+    assert [user['id'] for user in json.loads(response.data)] == ids[4:8]
+
+
+def test_creation_between_pages(client, users):
+    """ Users created meanwhile do not shift the pages
+    """
+    ids = sorted(user.id for user in users)
+    response = client.get("/api/v1/users?limit=5")
+    assert len(json.loads(response.data)) == 5
+    cursor = response.headers['X-Next-Cursor']
+    User(id="0", email="first@example.com").save()
+    response = client.get("/api/v1/users?limit=5&cursor=" + cursor)
+    assert [user['id'] for user in json.loads(response.data)] == ids[5:]
+
+
+def test_fields_and_ndjson(client, users):
+    """ fields projects the attributes, ndjson gives a user per line
+    """
+    response = client.get("/api/v1/users?fields=id,email&format=ndjson")
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.data.decode().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'id': user.id, 'email': user.email} for user in users]
+
+
+@pytest.mark.parametrize("query", [
+    "limit=0", "limit=-1", "limit=a", "format=xml"])
+def test_invalid_parameters(client, users, query):
+    """ Invalid parameters are a 400
+    """
+    assert client.get("/api/v1/users?" + query).status_code == 400